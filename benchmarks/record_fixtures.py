@@ -0,0 +1,69 @@
+from statsbombpy.config import OPEN_DATA_PATHS
+import argparse
+import requests
+import logging
+import json
+import os
+
+# Configuração do logger
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.StreamHandler()
+    ]
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "data")
+
+def record(url: str, fixtures_dir: str, session: requests.Session) -> object:
+    """
+        Baixa um arquivo do open-data da StatsBomb e o grava no mesmo caminho relativo dentro de fixtures_dir.
+    """
+    relative_path = url.split("/open-data/master/data/", 1)[1]
+    path = os.path.join(fixtures_dir, relative_path)
+
+    response = session.get(url)
+    response.raise_for_status()
+    data = response.json()
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+
+    logger.info(f"Recorded {relative_path} ({os.path.getsize(path) / 1024:.0f} KiB)")
+    return data
+
+def record_fixtures(competition_id: int, season_id: int, max_matches: int, fixtures_dir: str) -> None:
+    """
+        Grava competições, partidas, eventos e escalações de uma temporada no layout do open-data,
+        o mesmo lido por STATSBOMB_OPEN_DATA_DIR, para que os benchmarks rodem sem rede.
+    """
+    session = requests.Session()
+
+    record(OPEN_DATA_PATHS["competitions"], fixtures_dir, session)
+    matches = record(
+        OPEN_DATA_PATHS["matches"].format(competition_id=competition_id, season_id=season_id),
+        fixtures_dir,
+        session
+    )
+
+    for match in matches[:max_matches]:
+        record(OPEN_DATA_PATHS["events"].format(match_id=match["match_id"]), fixtures_dir, session)
+        record(OPEN_DATA_PATHS["lineups"].format(match_id=match["match_id"]), fixtures_dir, session)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Grava os arquivos do open-data da StatsBomb usados pelos benchmarks.")
+    parser.add_argument("--competition_id", type=int, default=43)
+    parser.add_argument("--season_id", type=int, default=106)
+    parser.add_argument("--max_matches", type=int, default=3, help="Partidas da temporada com eventos e escalações gravados")
+    parser.add_argument("--fixtures_dir", default=DEFAULT_FIXTURES_DIR)
+    args = parser.parse_args()
+
+    record_fixtures(args.competition_id, args.season_id, args.max_matches, args.fixtures_dir)
+
+if __name__ == "__main__":
+    main()
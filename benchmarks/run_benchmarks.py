@@ -0,0 +1,265 @@
+from typing import Dict, Any, List, Callable, Optional, Tuple
+import subprocess
+import statistics
+import tempfile
+import platform
+import argparse
+import logging
+import time
+import json
+import sys
+import os
+
+DEFAULT_FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "data")
+DEFAULT_RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+# Tamanhos de página do /events usados para medir a latência em função do tamanho da resposta
+EVENTS_PAGE_SIZES = [100, 1000]
+
+def configure_environment(fixtures_dir: str) -> None:
+    """
+        Aponta os serviços para as fixtures gravadas e para um armazenamento temporário, sem rede.
+
+        Deve ser chamado antes de importar os serviços, que leem a configuração na importação.
+    """
+    os.environ["STATSBOMB_OPEN_DATA_DIR"] = fixtures_dir
+    os.environ["STATSBOMB_OFFLINE"] = "true"
+    os.environ["STATSBOMB_STORE_DIR"] = tempfile.mkdtemp(prefix="statsbomb_store_")
+    os.environ["LLM_CACHE_PATH"] = os.path.join(tempfile.mkdtemp(prefix="llm_cache_"), "llm_cache.sqlite3")
+
+def list_fixture_matches(fixtures_dir: str) -> List[Tuple[int, int, int]]:
+    """
+        Lista (competition_id, season_id, match_id) das partidas com eventos e escalações gravados.
+    """
+    matches_dir = os.path.join(fixtures_dir, "matches")
+    fixture_matches = []
+
+    for competition_id in sorted(os.listdir(matches_dir)):
+        for season_file in sorted(os.listdir(os.path.join(matches_dir, competition_id))):
+            with open(os.path.join(matches_dir, competition_id, season_file), encoding="utf-8") as f:
+                matches = json.load(f)
+
+            for match in matches:
+                match_id = match["match_id"]
+
+                if (os.path.exists(os.path.join(fixtures_dir, "events", f"{match_id}.json"))
+                        and os.path.exists(os.path.join(fixtures_dir, "lineups", f"{match_id}.json"))):
+                    fixture_matches.append((int(competition_id), int(season_file[:-len(".json")]), match_id))
+
+    return fixture_matches
+
+def get_git_commit() -> Optional[str]:
+    """
+        Commit atual do repositório, para identificar o relatório.
+    """
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+def percentile(timings: List[float], q: float) -> float:
+    """
+        Percentil q (0 a 1) de uma lista de tempos, pelo vizinho mais próximo.
+    """
+    ordered = sorted(timings)
+    return ordered[round(q * (len(ordered) - 1))]
+
+def time_case(run: Callable[[], Any], runs: int, clear_caches: Optional[Callable[[], None]]) -> Tuple[List[float], Any]:
+    """
+        Executa um caso runs vezes e retorna os tempos em milissegundos e o último resultado.
+
+        Com clear_caches, os caches em memória e os índices de partidas são limpos antes de cada execução
+        (leitura do armazenamento em disco).
+    """
+    timings = []
+    result = None
+
+    for _ in range(runs):
+        if clear_caches is not None:
+            clear_caches()
+
+        started_at = time.perf_counter()
+        result = run()
+        timings.append((time.perf_counter() - started_at) * 1000)
+
+    return timings, result
+
+def build_cases(client: Any, fixture_match: Tuple[int, int, int]) -> List[Tuple[str, str, Callable[[], Any]]]:
+    """
+        Monta os casos (nome, payload, função) de uma partida: serviços e rotas em vários tamanhos de resposta.
+    """
+    from service.statsbomb_service import StatsBombService
+
+    competition_id, season_id, match_id = fixture_match
+
+    StatsBombService.get_matches_dict(competition_id, season_id)
+    events = StatsBombService.get_events_frame(match_id)
+    match_dict = StatsBombService.get_match_dict(match_id)
+    player_name = events['player'].value_counts().index[0]
+
+    def get(path: str, **params: Any) -> Any:
+        response = client.get(path, params=params)
+        response.raise_for_status()
+        return response.content
+
+    cases = [
+        ("service.get_match_dict", "match", lambda: StatsBombService.get_match_dict(match_id)),
+        ("service.get_events_dict", "Shot", lambda: StatsBombService.get_events_dict(match_id, event_type_list=["Shot"])),
+        ("service.get_events_dict", "Pass", lambda: StatsBombService.get_events_dict(match_id, event_type_list=["Pass"])),
+        ("service.get_events_dict", "all", lambda: StatsBombService.get_events_dict(match_id)),
+        ("service.get_player_profile", player_name, lambda: StatsBombService.get_player_profile(match_id, player_name)),
+        ("GET /match", "match", lambda: get("/match", match_id=match_id)),
+        ("GET /events", "Shot", lambda: get("/events", match_id=match_id, event_type_list="Shot")),
+    ]
+
+    cases += [
+        ("GET /events", f"limit={limit}", lambda limit=limit: get("/events", match_id=match_id, limit=limit))
+        for limit in EVENTS_PAGE_SIZES
+    ]
+
+    cases += [
+        ("GET /events", "all", lambda: get("/events", match_id=match_id)),
+        ("GET /lineups", match_dict['home_team'], lambda: get("/lineups", match_id=match_id, team=match_dict['home_team'])),
+        ("GET /player_profile", player_name, lambda: get("/player_profile", match_id=match_id, player_name=player_name)),
+        ("GET /player_profiles", "match", lambda: get("/player_profiles", match_id=match_id)),
+    ]
+
+    return cases
+
+def measure_payload(result: Any) -> Tuple[int, Optional[int]]:
+    """
+        Tamanho em bytes (JSON) e número de linhas do resultado de um caso.
+    """
+    if isinstance(result, bytes):
+        payload = result
+    elif hasattr(result, "model_dump_json"):
+        payload = result.model_dump_json().encode("utf-8")
+    else:
+        payload = json.dumps(result, default=str).encode("utf-8")
+
+    try:
+        data = json.loads(payload)
+    except ValueError:
+        data = None
+
+    return len(payload), len(data) if isinstance(data, list) else None
+
+def run_benchmarks(fixtures_dir: str, runs: int, max_matches: int) -> Dict[str, Any]:
+    """
+        Executa todos os casos nas partidas gravadas, com os caches frios e quentes, e monta o relatório.
+    """
+    configure_environment(fixtures_dir)
+
+    from fastapi.testclient import TestClient
+    from service.statsbomb_service import StatsBombService
+    from api_app import app
+
+    # Logs em nível INFO a cada chamada distorceriam as medições
+    logging.getLogger().setLevel(logging.WARNING)
+
+    results = []
+
+    with TestClient(app) as client:
+        for fixture_match in list_fixture_matches(fixtures_dir)[:max_matches]:
+            for name, payload, run in build_cases(client, fixture_match):
+                # Execução inicial fora da medição, para popular o armazenamento em disco a partir das fixtures
+                run()
+
+                for mode, clear in (("cold", StatsBombService.clear_caches), ("warm", None)):
+                    timings, result = time_case(run, runs, clear)
+                    payload_bytes, rows = measure_payload(result)
+
+                    results.append({
+                        "name": name,
+                        "payload": payload,
+                        "match_id": fixture_match[2],
+                        "mode": mode,
+                        "runs": runs,
+                        "min_ms": round(min(timings), 3),
+                        "mean_ms": round(statistics.mean(timings), 3),
+                        "p50_ms": round(percentile(timings, 0.5), 3),
+                        "p95_ms": round(percentile(timings, 0.95), 3),
+                        "max_ms": round(max(timings), 3),
+                        "payload_bytes": payload_bytes,
+                        "rows": rows,
+                    })
+
+                    print(f"{name:<28} {payload:<32} {mode:<5} p50 {results[-1]['p50_ms']:>9.2f} ms  {payload_bytes:>10} B")
+
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "git_commit": get_git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "fixtures_dir": fixtures_dir,
+            "runs": runs,
+        },
+        "results": results,
+    }
+
+def compare_reports(report: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[Dict[str, Any]]:
+    """
+        Compara a mediana de cada caso com a do relatório base e retorna os casos que ficaram mais lentos que o limite.
+    """
+    def key(result: Dict[str, Any]) -> Tuple:
+        return result["name"], result["payload"], result["match_id"], result["mode"]
+
+    baseline_results = {key(result): result for result in baseline["results"]}
+    regressions = []
+
+    for result in report["results"]:
+        base = baseline_results.get(key(result))
+
+        if base is None or base["p50_ms"] == 0:
+            continue
+
+        change = result["p50_ms"] / base["p50_ms"] - 1
+
+        if change > threshold:
+            regressions.append({**result, "baseline_p50_ms": base["p50_ms"], "change": round(change, 3)})
+
+    return regressions
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmarks do StatsBombService e das rotas do FastAPI com fixtures gravadas, sem rede.")
+    parser.add_argument("--fixtures_dir", default=DEFAULT_FIXTURES_DIR, help="Diretório no layout do open-data (ver record_fixtures.py)")
+    parser.add_argument("--runs", type=int, default=20, help="Execuções de cada caso em cada modo")
+    parser.add_argument("--max_matches", type=int, default=3, help="Partidas gravadas usadas")
+    parser.add_argument("--output", help="Arquivo JSON do relatório (padrão: benchmarks/results/<commit>-<data>.json)")
+    parser.add_argument("--baseline", help="Relatório anterior para comparação")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Aumento relativo da mediana considerado regressão")
+    args = parser.parse_args()
+
+    if not os.path.isdir(os.path.join(args.fixtures_dir, "matches")):
+        raise SystemExit(f"Fixtures not found in {args.fixtures_dir}, record them with benchmarks/record_fixtures.py")
+
+    report = run_benchmarks(args.fixtures_dir, args.runs, args.max_matches)
+
+    output = args.output or os.path.join(
+        DEFAULT_RESULTS_DIR, f"{report['meta']['git_commit'] or 'local'}-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    print(f"Report written to {output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare_reports(report, json.load(f), args.threshold)
+
+        for regression in regressions:
+            print(
+                f"REGRESSION {regression['name']} {regression['payload']} {regression['mode']}: "
+                f"{regression['baseline_p50_ms']:.2f} ms -> {regression['p50_ms']:.2f} ms (+{regression['change']:.0%})"
+            )
+
+        if regressions:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
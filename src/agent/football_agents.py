@@ -1,21 +1,35 @@
 from langchain_google_genai import GoogleGenerativeAI
 from langchain_openai import ChatOpenAI
-from langchain.prompts import PromptTemplate
-from langchain.agents import create_react_agent, AgentExecutor, Tool
-from typing import List
+from langchain.prompts import PromptTemplate, ChatPromptTemplate, MessagesPlaceholder
+from langchain.agents import create_react_agent, create_tool_calling_agent, AgentExecutor, Tool
+from typing import List, Dict, Any, Coroutine
+from functools import lru_cache
 from langchain import hub
 from langchain_core.tools import Tool
 from langchain_community.utilities.wikipedia import WikipediaAPIWrapper
 from langchain_community.tools.wikipedia.tool import WikipediaQueryRun
-from .football_tools import get_player_info, get_match_events
+from .football_tools import get_player_info, get_match_events, get_match_scoreline, compare_players
+import contextvars
+import threading
+import asyncio
+import os
 
+REACT_AGENT = "react"
+TOOL_CALLING_AGENT = "tool_calling"
+
+# Modo do agente: ReAct (uma tool por passo) ou tool calling (várias tools por passo, executadas em paralelo)
+AGENT_MODE = os.getenv("AGENT_MODE", REACT_AGENT)
+
+@lru_cache(maxsize=1)
 def load_tools() -> List[Tool]:
     """
-        Carrega as ferramentas/tools disponíveis para o agente
+        Carrega as ferramentas/tools disponíveis para o agente (uma vez por processo)
     """
     tools = [
         get_player_info,
         get_match_events,
+        get_match_scoreline,
+        compare_players,
         WikipediaQueryRun(
             api_wrapper=WikipediaAPIWrapper(),
             description="A comprehensive wrapper around Wikipedia, ideal for retrieving"
@@ -27,9 +41,42 @@ def load_tools() -> List[Tool]:
     return tools
 
 
+@lru_cache(maxsize=1)
+def load_tool_prompt_inputs() -> Dict[str, List[str]]:
+    """
+        Nomes e descrições das ferramentas para o prompt, calculados uma vez por processo
+    """
+    tools = load_tools()
+    return {
+        "tool_names": [tool.name for tool in tools],
+        "tools": [tool.description for tool in tools],
+    }
+
+
+def load_tool_calling_prompt() -> ChatPromptTemplate:
+    """
+        Carrega o prompt do agente de tool calling
+    """
+    return ChatPromptTemplate.from_messages([
+        (
+            "system",
+            "Answer the user's questions about football as best you can, using the tools when needed."
+            " When several tool calls do not depend on each other (for example, one per player),"
+            " request them all in the same step.\n\n"
+            "Information Related to the Question: {related_info}"
+        ),
+        ("human", "{input}"),
+        MessagesPlaceholder("agent_scratchpad"),
+    ])
+
+
+@lru_cache(maxsize=1)
 def load_agent() -> AgentExecutor:
     """
-        Carrega o agente de chat
+        Carrega o agente de chat (uma vez por processo).
+
+        O AgentExecutor não guarda estado entre chamadas, então a mesma instância atende todas as conversas.
+        Em AGENT_MODE=tool_calling, o modelo pode pedir várias tools no mesmo passo (ver run_agent).
     """
     prompt = """
     Answer the following questions as best you can. You have access to the following tools:
@@ -77,7 +124,11 @@ def load_agent() -> AgentExecutor:
     
     llm = ChatOpenAI(temperature=0, model_name="gpt-4o")
     tools = load_tools()
-    agent = create_react_agent(llm, tools=tools, prompt=prompt)
+
+    if AGENT_MODE == TOOL_CALLING_AGENT:
+        agent = create_tool_calling_agent(llm, tools=tools, prompt=load_tool_calling_prompt())
+    else:
+        agent = create_react_agent(llm, tools=tools, prompt=prompt)
     
     return AgentExecutor(
         agent=agent,
@@ -86,3 +137,41 @@ def load_agent() -> AgentExecutor:
         verbose=True,
         max_iterations=5
     )
+
+
+@lru_cache(maxsize=1)
+def load_agent_loop() -> asyncio.AbstractEventLoop:
+    """
+        Event loop do agente, executado em uma thread própria durante todo o processo.
+
+        O ChatOpenAI do agente é criado uma vez por processo e o seu cliente async mantém conexões
+        presas ao loop em que foram abertas; com um asyncio.run por mensagem, o loop da mensagem
+        anterior já estaria fechado. Todas as conversas usam este mesmo loop.
+    """
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="agent-loop", daemon=True).start()
+    return loop
+
+
+async def _run_in_context(context: contextvars.Context, coroutine: Coroutine) -> Any:
+    """
+        Executa a corrotina com as variáveis de contexto de quem chamou (ex: o cache da conversa das tools).
+    """
+    for var, value in context.items():
+        var.set(value)
+
+    return await coroutine
+
+
+def run_agent(agent: AgentExecutor, input_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+        Executa o agente pela API async do AgentExecutor, no event loop do agente (ver load_agent_loop).
+
+        As tools pedidas no mesmo passo rodam ao mesmo tempo no pool de threads do event loop,
+        e seus resultados são reunidos antes do próximo passo de raciocínio.
+    """
+    coroutine = _run_in_context(
+        contextvars.copy_context(),
+        agent.ainvoke(input=input_data, handle_parsing_errors=True)
+    )
+    return asyncio.run_coroutine_threadsafe(coroutine, load_agent_loop()).result()
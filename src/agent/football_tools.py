@@ -1,53 +1,269 @@
 from langchain.tools import tool
+from fastapi.exceptions import HTTPException
 from service.statsbomb_service import StatsBombService
-from model.stats_bomb_model import MatchEvents, PlayerProfile
-from fastapi.encoders import jsonable_encoder
-from typing import Dict
+from service.event_encoder_service import EventEncoderService
+from service.cache_service import LRUCache
+from model.stats_bomb_model import PlayerProfile, MatchEvents, MATCH_STATS_FIELDS
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Any, List, Optional, Callable, Iterator, Tuple
+import pandas as pd
 import json
+import os
+
+# Cache dos resultados das tools, compartilhado por todas as conversas do processo
+TOOL_CACHE = LRUCache(
+    "agent_tools",
+    maxsize=int(os.getenv("AGENT_TOOL_CACHE_SIZE", 256)),
+    ttl=float(os.getenv("AGENT_TOOL_CACHE_TTL", 3600))
+)
+
+# Cache da conversa atual, ativado com conversation_cache; sobrevive às expirações e remoções do cache do processo
+_conversation_cache: ContextVar[Optional[Dict[Tuple[str, str], str]]] = ContextVar("agent_conversation_cache", default=None)
+
+SHOTS_ON_TARGET = {"Goal", "Saved", "Saved To Post"}
+
+# Disputa de pênaltis: não entra no placar, nos chutes nem no xG da partida
+PENALTY_SHOOTOUT_PERIOD = 5
+
+# Gols contra: o evento "For" é do time beneficiado e o "Against" traz o jogador que marcou contra
+OWN_GOAL_FOR = "Own Goal For"
+OWN_GOAL_AGAINST = "Own Goal Against"
+
+@contextmanager
+def conversation_cache(cache: Dict[Tuple[str, str], str]) -> Iterator[None]:
+    """
+        Usa o dicionário informado como cache da conversa para as tools executadas dentro do bloco.
+    """
+    token = _conversation_cache.set(cache)
+    try:
+        yield
+    finally:
+        _conversation_cache.reset(token)
+
+def _parse_action_input(action_input: str) -> Dict[str, Any]:
+    """
+        Lê o action_input uma única vez, aceitando o JSON entre crases que o LLM às vezes gera.
+    """
+    action_input = action_input.strip().strip("`").strip()
+
+    if action_input.startswith("json"):
+        action_input = action_input[len("json"):]
+
+    return json.loads(action_input)
+
+def _to_json(data: Any) -> str:
+    """
+        Serializa o resultado de uma tool em JSON compacto, para gastar menos tokens no prompt.
+    """
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False, default=str)
+
+def _cached_tool_call(tool_name: str, params: Dict[str, Any], loader: Callable[[], str]) -> str:
+    """
+        Executa uma tool consultando antes o cache da conversa e depois o do processo.
+    """
+    key = (tool_name, _to_json(params))
+    conversation = _conversation_cache.get()
+
+    if conversation is not None and key in conversation:
+        return conversation[key]
+
+    result = TOOL_CACHE.get_or_set(key, loader)
+
+    if conversation is not None:
+        conversation[key] = result
+
+    return result
+
+def _compact_player_profile(player_profile: PlayerProfile) -> Dict[str, Any]:
+    """
+        Resume o perfil do jogador, sem as estatísticas zeradas e os detalhes das posições.
+    """
+    player_info = player_profile.player_info
+    compact_profile = {
+        "player_name": player_info.player_name,
+        "jersey_number": player_info.jersey_number,
+        "country": player_info.country,
+        "positions": [position.position for position in player_info.positions],
+        "match_stats": {field: total for field, total in player_profile.match_stats.model_dump().items() if total},
+    }
+
+    if player_info.cards:
+        compact_profile["cards"] = player_info.cards
+
+    return compact_profile
+
+def _find_player_profiles(match_id: int, player_names: List[str]) -> Tuple[List[PlayerProfile], List[str]]:
+    """
+        Busca os perfis dos jogadores de uma partida pelo nome ou apelido, sem diferenciar acentos e maiúsculas,
+        da mesma forma que a rota /player_profile.
+
+        Retorna os perfis encontrados e os nomes não encontrados (ou sem eventos na partida).
+    """
+    found: List[PlayerProfile] = []
+    not_found: List[str] = []
+
+    for player_name in player_names:
+        try:
+            found.append(StatsBombService.get_player_profile(match_id, player_name))
+        except HTTPException as e:
+            if e.status_code != 404:
+                raise
+            not_found.append(player_name)
+
+    return found, not_found
 
 @tool
-def get_player_info(action_input: str) -> Dict:
-    """   
+def get_player_info(action_input: str) -> str:
+    """
         Get the player profile using match_id and player_name.
-        
+
         Args:
         - action_input(str): The input data containing the match_id.
             format: {"match_id": 777, "player_name": "Some Player Name"}
-        
+
         Returns:
-        - dict: The player profile from the specified match or None if the player is not found.
+        - str: The player profile (JSON, only non-zero stats) or a message if the player is not found.
     """
-    
-    try:
-        match_id = json.loads(action_input)["match_id"]
-        player_name = json.loads(action_input)["player_name"]
-        
-        player_profile: PlayerProfile = StatsBombService.get_player_profile(match_id, player_name)
-        return player_profile.model_dump()
-    except Exception as e:
-        if "404" in str(e):
-            return None
-        raise e
-    
+
+    params = _parse_action_input(action_input)
+    match_id = params["match_id"]
+    player_name = params["player_name"]
+
+    def load() -> str:
+        player_profiles, _ = _find_player_profiles(match_id, [player_name])
+
+        if not player_profiles:
+            return f"Player {player_name} not found in match {match_id}."
+
+        return _to_json(_compact_player_profile(player_profiles[0]))
+
+    return _cached_tool_call("get_player_info", {"match_id": match_id, "player_name": player_name}, load)
+
 @tool
-def get_match_events(action_input: str) -> Dict:
-    """   
+def get_match_events(action_input: str) -> str:
+    """
         Get the match events using match_id, competition_id and season_id.
-        
+
+        Args:
+        - action_input(str): The input data containing the match_id.
+            format: {"match_id": int}
+
+        Returns:
+        - str: The match events in a compact format (see the legend in the first line),
+            goals and shots first, followed by as many other event types as fit the token budget.
+    """
+
+    match_id = _parse_action_input(action_input)["match_id"]
+
+    def load() -> str:
+        match_dict = StatsBombService.get_match_dict(match_id)
+        encoded_events, _ = EventEncoderService.encode_match(match_dict)
+        return encoded_events
+
+    return _cached_tool_call("get_match_events", {"match_id": match_id}, load)
+
+@tool
+def get_match_scoreline(action_input: str) -> str:
+    """
+        Get the scoreline, the goals (minute, team and scorer, including own goals) and the shots,
+        shots on target and expected goals (xG) of each team in a match, in a single call.
+        Penalty shootout kicks are not included.
+
         Args:
         - action_input(str): The input data containing the match_id.
             format: {"match_id": int}
-        
+
         Returns:
-        - dict: The match events from the specified match.
-    """
-    
-    # The application supports passing as many events as you want,
-    #   but it was chosen to pass only shot events due to the large number of tokens
-    events_dict = StatsBombService.get_events_dict(
-        match_id = json.loads(action_input)["match_id"],
-        event_type_list=[
-            MatchEvents.SHOT.value, 
+        - str: The match scoreline and shot summary (JSON).
+    """
+
+    match_id = _parse_action_input(action_input)["match_id"]
+
+    def load() -> str:
+        match_dict = StatsBombService.get_match_dict(match_id)
+        events = StatsBombService.get_events_frame(match_id).sort_values('index')
+        events = events[events['period'] < PENALTY_SHOOTOUT_PERIOD]
+
+        shots = events[events['type'] == MatchEvents.SHOT.value]
+        shot_outcomes = shots['shot_outcome'] if 'shot_outcome' in shots.columns else pd.Series(None, index=shots.index)
+
+        teams = {
+            team: {
+                "shots": int((shots['team'] == team).sum()),
+                "shots_on_target": int(((shots['team'] == team) & shot_outcomes.isin(SHOTS_ON_TARGET)).sum()),
+                "xg": round(float(shots.loc[shots['team'] == team].get('shot_statsbomb_xg', pd.Series(dtype=float)).sum()), 2),
+            }
+            for team in (match_dict['home_team'], match_dict['away_team'])
+        }
+
+        goals = [
+            {"index": shot['index'], "minute": int(shot['minute']), "team": shot['team'], "player": shot['player']}
+            for shot in StatsBombService.to_records(shots[shot_outcomes == "Goal"])
+        ]
+
+        own_goals_against = StatsBombService.to_records(events[events['type'] == OWN_GOAL_AGAINST])
+
+        for own_goal in StatsBombService.to_records(events[events['type'] == OWN_GOAL_FOR]):
+            scorer = next(
+                (
+                    against['player'] for against in own_goals_against
+                    if against['period'] == own_goal['period'] and against['minute'] == own_goal['minute']
+                ),
+                None
+            )
+            goals.append({
+                "index": own_goal['index'],
+                "minute": int(own_goal['minute']),
+                "team": own_goal['team'],
+                "player": scorer,
+                "own_goal": True,
+            })
+
+        goals = [
+            {field: value for field, value in goal.items() if field != "index"}
+            for goal in sorted(goals, key=lambda goal: goal["index"])
         ]
-    )
-    return jsonable_encoder(events_dict, exclude_none=True)
+
+        return _to_json({
+            "score": f"{match_dict['home_team']} {match_dict['home_score']} x {match_dict['away_score']} {match_dict['away_team']}",
+            "goals": goals,
+            "teams": teams,
+        })
+
+    return _cached_tool_call("get_match_scoreline", {"match_id": match_id}, load)
+
+@tool
+def compare_players(action_input: str) -> str:
+    """
+        Compare two (or more) players of the same match side by side in a single call.
+
+        Args:
+        - action_input(str): The input data containing the match_id and the player names.
+            format: {"match_id": 777, "player_names": ["Some Player Name", "Another Player Name"]}
+
+        Returns:
+        - str: The players info and, for each non-zero stat, the values in the same order
+            as the player names (JSON), plus the names that were not found in the match.
+    """
+
+    params = _parse_action_input(action_input)
+    match_id = params["match_id"]
+    player_names = params["player_names"]
+
+    def load() -> str:
+        player_profiles, not_found = _find_player_profiles(match_id, player_names)
+        compact_profiles = [_compact_player_profile(player_profile) for player_profile in player_profiles]
+
+        match_stats = [compact_profile.pop("match_stats") for compact_profile in compact_profiles]
+        fields = [field for field in MATCH_STATS_FIELDS.values() if any(field in stats for stats in match_stats)]
+
+        stats = {field: [player_stats.get(field, 0) for player_stats in match_stats] for field in fields}
+
+        return _to_json({
+            "players": compact_profiles,
+            "stats": stats,
+            "not_found": not_found,
+        })
+
+    return _cached_tool_call("compare_players", {"match_id": match_id, "player_names": player_names}, load)
@@ -1,15 +1,28 @@
-from fastapi import FastAPI, Query
+from dotenv import load_dotenv
+
+# Carregar variáveis de ambiente antes dos serviços, que leem sua configuração na importação
+load_dotenv()
+
+from fastapi import FastAPI, Query, Header
 from fastapi.encoders import jsonable_encoder
 from service.statsbomb_service import StatsBombService
 from service.openai_client_service import OpenAIClientService
-from dotenv import load_dotenv
-from typing import Dict, Any, List, Literal
-from fastapi.responses import JSONResponse
+from service.async_statsbomb_service import AsyncStatsBombService
+from service.export_service import ExportService
+from service.llm_cache_service import LLMCacheService
+from service.event_encoder_service import EventEncoderService
+from service.metrics_service import MetricsService
+from service.profiling_service import ProfilingService, PROFILE_HEADER
+from typing import Dict, Any, List, Literal, Optional, Iterator, AsyncIterator
+from fastapi.responses import JSONResponse, StreamingResponse, Response, PlainTextResponse
 from fastapi.requests import Request
 from model.openai_model import ChatRequest, ChatResponse, ChatSummary, ChatNarration
-from model.stats_bomb_model import MatchEvents, PlayerProfile
+from model.stats_bomb_model import PlayerProfile, SeasonPlayerStats, TeamMatchStats, PlayerMatchStats
+import pandas as pd
 import requests
 import logging
+import json
+import time
 
 # Configuração do logger
 logging.basicConfig(
@@ -20,9 +33,6 @@ logging.basicConfig(
     ]
 )
 
-# Carregar variáveis de ambiente
-load_dotenv()
-
 # Inicialização do app FastAPI
 app = FastAPI()
 
@@ -46,47 +56,120 @@ async def global_exception_handler(request: Request, exc: Exception):
         content={"message": "Internal Server Error"},
     )
 
+@app.middleware("http")
+async def profiling_middleware(request: Request, call_next):
+    """
+        Profiling opcional da requisição (cabeçalho X-Profile: 1 ou PROFILING_SAMPLE_RATE).
+
+        Grava o arquivo pstats em PROFILING_DIR e devolve as funções mais custosas no cabeçalho X-Profile-Summary.
+    """
+    token = ProfilingService.start() if ProfilingService.should_profile(request.headers.get(PROFILE_HEADER)) else None
+    
+    if token is None:
+        return await call_next(request)
+    
+    started_at = time.perf_counter()
+    response = None
+    
+    try:
+        response = await call_next(request)
+    finally:
+        route = request.scope.get("route")
+        summary = ProfilingService.finish(
+            token,
+            request.method,
+            route.path if route else request.url.path,
+            dict(request.query_params),
+            time.perf_counter() - started_at
+        )
+    
+    response.headers["X-Profile-File"] = summary["file"]
+    response.headers["X-Profile-Summary"] = ProfilingService.format_header(summary)
+    return response
+
+@app.middleware("http")
+async def metrics_middleware(request: Request, call_next):
+    """
+        Registra a latência e o tamanho da resposta de cada requisição, agrupadas pelo template da rota.
+
+        Em respostas em streaming, a latência vai até o envio dos cabeçalhos e o tamanho não é conhecido.
+    """
+    started_at = time.perf_counter()
+    response = None
+    
+    try:
+        response = await call_next(request)
+        return response
+    finally:
+        route = request.scope.get("route")
+        labels = {"method": request.method, "route": route.path if route else "unmatched"}
+        
+        status_code = response.status_code if response is not None else 500
+        
+        MetricsService.observe("http_request_duration_seconds", time.perf_counter() - started_at, status=status_code, **labels)
+        
+        if response is not None and response.headers.get("content-length"):
+            MetricsService.observe("http_response_size_bytes", int(response.headers["content-length"]), **labels)
+
+
+async def _get_prompt_events(match_id: int, match_dict: Dict[str, Any]) -> str:
+    """
+        Obtém os eventos de uma partida codificados para o prompt do LLM.
+        
+        Os eventos são enviados em formato compacto, priorizando gols e chutes,
+        até o limite de tokens configurado em LLM_EVENTS_TOKEN_BUDGET.
+    """
+    encoded_events, _ = await AsyncStatsBombService.run(EventEncoderService.encode_match, match_dict)
+    return encoded_events
+
+async def _encode_response(content: Any) -> JSONResponse:
+    """
+        Converte o conteúdo da resposta para JSON no pool de threads da StatsBomb, fora do event loop.
+        
+        O JSONResponse é retornado diretamente, sem uma nova validação pelo modelo de resposta da rota.
+    """
+    encoded = await AsyncStatsBombService.run(jsonable_encoder, content)
+    return JSONResponse(content=encoded)
+
+def _encode_events(events: pd.DataFrame) -> List[Dict[str, Any]]:
+    """
+        Converte uma página de eventos em dicts prontos para JSON, omitindo os campos vazios.
+    """
+    return jsonable_encoder(StatsBombService.to_records(events), exclude_none=True)
 
 # Rotas principais
 
 @app.get("/match")
-def get_match(match_id: int, competition_id: int, season_id: int) -> Dict[str, Any]:
+async def get_match(match_id: int, competition_id: Optional[int] = None, season_id: Optional[int] = None) -> Dict[str, Any]:
     """ 
         Retorna informações de uma partida específica.
         
         Parâmetros:
         - match_id: int
-        - competition_id: int
-        - season_id: int    
+        - competition_id: int (opcional se a partida já estiver indexada)
+        - season_id: int (opcional se a partida já estiver indexada)
     """
-    return StatsBombService.get_match_dict(match_id, competition_id, season_id)
+    return await AsyncStatsBombService.get_match_dict(match_id, competition_id, season_id)
 
 @app.get("/match_summary") 
-def get_match_summary(match_id: int, competition_id: int, season_id: int) -> ChatSummary:
+async def get_match_summary(match_id: int, competition_id: Optional[int] = None, season_id: Optional[int] = None) -> ChatSummary:
     """ 
         Retorna um resumo de uma partida específica.
         
         Parâmetros:
         - match_id: int
-        - competition_id: int
-        - season_id: int
+        - competition_id: int (opcional se a partida já estiver indexada)
+        - season_id: int (opcional se a partida já estiver indexada)
     """
     
-    match_dict = StatsBombService.get_match_dict(match_id, competition_id, season_id)
+    match_dict = await AsyncStatsBombService.get_match_dict(match_id, competition_id, season_id)
     
-    # A aplicação suporta passar quantos eventos quiser,
-    #   porém foi escolhido passar apenas eventos de chutes devido a grande quantidade de tokens
-    events_dict = StatsBombService.get_events_dict(
-        match_id,
-        event_type_list=[
-            MatchEvents.SHOT.value, 
-        ]
-    )
-    summary = OpenAIClientService.get_match_summary(match_dict, events_dict)
+    events_dict = await _get_prompt_events(match_id, match_dict)
+    summary = await OpenAIClientService.aget_match_summary(match_dict, events_dict)
     return {"summary": summary}
 
 @app.get("/player_profile") 
-def get_player_profile(match_id: int, player_name: str) -> PlayerProfile:
+async def get_player_profile(match_id: int, player_name: str) -> PlayerProfile:
     """
         Retorna o perfil de um jogador específico em uma partida.
         
@@ -95,63 +178,253 @@ def get_player_profile(match_id: int, player_name: str) -> PlayerProfile:
         - player_name: str
     """
     
-    player_profile: PlayerProfile = StatsBombService.get_player_profile(match_id, player_name)
-    return jsonable_encoder(player_profile)
+    player_profile: PlayerProfile = await AsyncStatsBombService.get_player_profile(match_id, player_name)
+    return await _encode_response(player_profile)
 
-@app.get("/match_narration")
-def get_match_narration(
-        match_id: int,
+@app.get("/player_profiles")
+async def get_player_profiles(match_id: int) -> List[PlayerProfile]:
+    """
+        Retorna o perfil de todos os jogadores com eventos em uma partida.
+        
+        Parâmetros:
+        - match_id: int
+    """
+    
+    player_profiles: List[PlayerProfile] = await AsyncStatsBombService.get_player_profiles(match_id)
+    return await _encode_response(player_profiles)
+
+@app.get("/team_stats")
+async def get_team_stats(match_id: int) -> List[TeamMatchStats]:
+    """ 
+        Retorna os totais de eventos de cada time em uma partida.
+        
+        Parâmetros:
+        - match_id: int
+    """
+    return await AsyncStatsBombService.get_team_stats(match_id)
+
+@app.get("/player_stats")
+async def get_player_stats(match_id: int, team: Optional[str] = None) -> List[PlayerMatchStats]:
+    """ 
+        Retorna as estatísticas de todos os jogadores com eventos em uma partida.
+        
+        Parâmetros:
+        - match_id: int
+        - team: str (opcional, apenas os jogadores desse time)
+    """
+    return await AsyncStatsBombService.get_player_stats(match_id, team)
+
+@app.get("/season_player_stats")
+async def get_season_player_stats(
         competition_id: int,
         season_id: int,
-        style: Literal["Formal", "Humorous", "Technical"]
+        player_name: str = None,
+        refresh: bool = False
+    ) -> List[SeasonPlayerStats]:
+    """
+        Retorna os totais e médias (por 90 minutos e por partida) dos jogadores em uma temporada.
+        
+        Parâmetros:
+        - competition_id: int
+        - season_id: int
+        - player_name: str (opcional)
+        - refresh: bool, recalcula a agregação já armazenada
+    """
+    
+    season_player_stats = await AsyncStatsBombService.get_season_player_stats(competition_id, season_id, player_name, refresh)
+    return await _encode_response(season_player_stats)
+
+@app.get("/match_narration")
+async def get_match_narration(
+        match_id: int,
+        style: Literal["Formal", "Humorous", "Technical"],
+        competition_id: Optional[int] = None,
+        season_id: Optional[int] = None
     ) -> ChatNarration:
     """
         Retorna a narração de uma partida específica.
         
         Parâmetros:
         - match_id: int
-        - competition_id: int
-        - season_id: int
+        - style: Formal, Humorous ou Technical
+        - competition_id: int (opcional se a partida já estiver indexada)
+        - season_id: int (opcional se a partida já estiver indexada)
     """
     
-    match_dict = StatsBombService.get_match_dict(match_id, competition_id, season_id)
+    match_dict = await AsyncStatsBombService.get_match_dict(match_id, competition_id, season_id)
     
-    # A aplicação suporta passar quantos eventos quiser,
-    #   porém foi escolhido passar apenas eventos de chutes devido a grande quantidade de tokens
-    events_dict = StatsBombService.get_events_dict(
-        match_id,
-        event_type_list=[
-            MatchEvents.SHOT.value, 
-        ]
-    )
+    events_dict = await _get_prompt_events(match_id, match_dict)
     
-    narration = OpenAIClientService.get_match_narration(match_dict, events_dict, style)
+    narration = await OpenAIClientService.aget_match_narration(match_dict, events_dict, style)
     return {"narration": narration}
 
+async def _stream_sse(chunks: AsyncIterator[str]) -> AsyncIterator[str]:
+    """
+        Encaminha os tokens gerados como eventos SSE, finalizando com um evento done (ou error).
+    """
+    try:
+        async for chunk in chunks:
+            yield f"data: {json.dumps({'text': chunk})}\n\n"
+    except Exception as e:
+        logging.error(f"Failed to stream completion: {e}")
+        yield f"event: error\ndata: {json.dumps({'message': 'Internal Server Error'})}\n\n"
+        return
+    
+    yield "event: done\ndata: {}\n\n"
+
+@app.get("/match_summary_stream")
+async def stream_match_summary(match_id: int, competition_id: Optional[int] = None, season_id: Optional[int] = None) -> StreamingResponse:
+    """
+        Retorna o resumo de uma partida via Server-Sent Events, à medida que é gerado.
+        
+        Parâmetros:
+        - match_id: int
+        - competition_id: int (opcional se a partida já estiver indexada)
+        - season_id: int (opcional se a partida já estiver indexada)
+    """
+    
+    match_dict = await AsyncStatsBombService.get_match_dict(match_id, competition_id, season_id)
+    events_dict = await _get_prompt_events(match_id, match_dict)
+    
+    chunks = OpenAIClientService.astream_match_summary(match_dict, events_dict)
+    return StreamingResponse(_stream_sse(chunks), media_type="text/event-stream")
+
+@app.get("/match_narration_stream")
+async def stream_match_narration(
+        match_id: int,
+        style: Literal["Formal", "Humorous", "Technical"],
+        competition_id: Optional[int] = None,
+        season_id: Optional[int] = None
+    ) -> StreamingResponse:
+    """
+        Retorna a narração de uma partida via Server-Sent Events, à medida que é gerada.
+        
+        Parâmetros:
+        - match_id: int
+        - style: Formal, Humorous ou Technical
+        - competition_id: int (opcional se a partida já estiver indexada)
+        - season_id: int (opcional se a partida já estiver indexada)
+    """
+    
+    match_dict = await AsyncStatsBombService.get_match_dict(match_id, competition_id, season_id)
+    events_dict = await _get_prompt_events(match_id, match_dict)
+    
+    chunks = OpenAIClientService.astream_match_narration(match_dict, events_dict, style)
+    return StreamingResponse(_stream_sse(chunks), media_type="text/event-stream")
+
 # Rotas adicionais para testes
 
 @app.post("/chat")
-def get_chat_response(request: ChatRequest) -> ChatResponse:
-    response = OpenAIClientService.get_chat_response(request.message)
+async def get_chat_response(request: ChatRequest) -> ChatResponse:
+    response = await OpenAIClientService.aget_chat_response(request.message)
     return {"message": response}
 
 @app.get("/competitions")
-def get_competitions() -> List[Dict[str, Any]]:
-    return StatsBombService.get_competitions_dict()
+async def get_competitions() -> List[Dict[str, Any]]:
+    return await AsyncStatsBombService.get_competitions_dict()
 
 @app.get("/matches")
-def get_matches(competition_id: int, season_id: int) -> List[Dict[str, Any]]:
-    return StatsBombService.get_matches_dict(competition_id, season_id)
+async def get_matches(competition_id: int, season_id: int, accept: Optional[str] = Header(None)) -> List[Dict[str, Any]]:
+    """
+        Retorna as partidas de uma temporada.
+        
+        Com o header Accept em application/vnd.apache.arrow.stream ou application/vnd.apache.parquet,
+        retorna o DataFrame da statsbombpy em Arrow IPC ou Parquet em vez de JSON.
+    """
+    media_type = ExportService.negotiate(accept)
+    
+    if media_type:
+        matches = await AsyncStatsBombService.get_matches_frame(competition_id, season_id)
+        content = await AsyncStatsBombService.run(ExportService.export, matches, media_type)
+        return Response(content=content, media_type=media_type)
+    
+    return await AsyncStatsBombService.get_matches_dict(competition_id, season_id)
 
 @app.get("/events")
-def get_events(
+async def get_events(
         match_id: int,
         event_type_list: List[str] = Query(None),
-        player_name: str = None
-    ) -> List[Dict[str, Any]]:  
-    events = StatsBombService.get_events_dict(match_id, event_type_list, player_name)
-    return jsonable_encoder(events, exclude_none=True)
+        player_name: str = None,
+        cursor: Optional[int] = None,
+        limit: Optional[int] = Query(None, gt=0),
+        fields: List[str] = Query(None),
+        stream: bool = False,
+        accept: Optional[str] = Header(None)
+    ) -> List[Dict[str, Any]]:
+    """
+        Retorna os eventos de uma partida, ordenados pelo index do evento.
+        
+        Parâmetros:
+        - match_id: int
+        - event_type_list: List[str] (opcional)
+        - player_name: str (opcional)
+        - cursor: int, index do último evento já recebido (opcional)
+        - limit: int, tamanho da página (opcional)
+        - fields: List[str], colunas retornadas, ex: type, minute, player (opcional)
+        - stream: bool, retorna NDJSON (um evento por linha) à medida que é serializado
+        
+        O cursor da próxima página é retornado no header X-Next-Cursor.
+        
+        Com o header Accept em application/vnd.apache.arrow.stream ou application/vnd.apache.parquet,
+        retorna a página em Arrow IPC ou Parquet em vez de JSON.
+    """
+    events, next_cursor = await AsyncStatsBombService.get_events_page(
+        match_id, event_type_list, player_name, cursor, limit, fields
+    )
+    headers = {"X-Next-Cursor": str(next_cursor)} if next_cursor is not None else {}
+    media_type = ExportService.negotiate(accept)
+    
+    if media_type:
+        content = await AsyncStatsBombService.run(ExportService.export, events, media_type)
+        return Response(content=content, media_type=media_type, headers=headers)
+    
+    if stream:
+        return StreamingResponse(_stream_ndjson(events), media_type="application/x-ndjson", headers=headers)
+    
+    content = await AsyncStatsBombService.run(_encode_events, events)
+    return JSONResponse(content=content, headers=headers)
+
+def _stream_ndjson(frame: pd.DataFrame, chunk_size: int = 500) -> Iterator[str]:
+    """
+        Serializa um DataFrame em NDJSON aos poucos, convertendo um bloco de linhas por vez.
+    """
+    for start in range(0, len(frame), chunk_size):
+        for record in StatsBombService.to_records(frame.iloc[start:start + chunk_size]):
+            yield json.dumps(jsonable_encoder(record, exclude_none=True)) + "\n"
 
 @app.get("/lineups")
-def get_lineups(match_id: int, team: str) -> List[Dict[str, Any]]:
-    return StatsBombService.get_lineups_dict(match_id, team)
\ No newline at end of file
+async def get_lineups(match_id: int, team: str) -> List[Dict[str, Any]]:
+    return await AsyncStatsBombService.get_lineups_dict(match_id, team)
+
+@app.delete("/llm_cache")
+async def invalidate_llm_cache(
+        match_id: Optional[int] = None,
+        kind: Optional[Literal["summary", "narration"]] = None
+    ) -> Dict[str, int]:
+    """
+        Remove resumos e narrações do cache persistente do LLM.
+        
+        Parâmetros:
+        - match_id: int (opcional, todas as partidas se omitido)
+        - kind: summary ou narration (opcional, ambos se omitido)
+    """
+    return {"deleted": await LLMCacheService.ainvalidate(match_id, kind)}
+
+@app.get("/cache_stats")
+async def get_cache_stats() -> List[Dict[str, Any]]:
+    return StatsBombService.get_cache_stats()
+
+@app.get("/metrics")
+async def get_metrics() -> PlainTextResponse:
+    """
+        Métricas do processo no formato texto do Prometheus: latência por rota, chamadas à StatsBomb e à OpenAI,
+        tokens do LLM, tamanho das respostas e hit ratio dos caches.
+    """
+    return PlainTextResponse(MetricsService.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/debug/profiles")
+async def get_recent_profiles() -> List[Dict[str, Any]]:
+    """
+        Resumo dos últimos perfis de requisições (ver X-Profile e PROFILING_SAMPLE_RATE), do mais recente ao mais antigo.
+    """
+    return list(reversed(ProfilingService.recent))
\ No newline at end of file
@@ -0,0 +1,133 @@
+from dotenv import load_dotenv
+
+# Carregar variáveis de ambiente antes dos serviços, que leem sua configuração na importação
+load_dotenv()
+
+from service.async_statsbomb_service import AsyncStatsBombService
+from service.openai_client_service import OpenAIClientService, OPENAI_MODEL
+from service.llm_cache_service import LLMCacheService
+from service.event_encoder_service import EventEncoderService
+from service.rate_limiter_service import RateLimiter
+from service.statsbomb_store import StatsBombStore
+from typing import Dict, Any, List
+import argparse
+import asyncio
+import logging
+import time
+
+# Configuração do logger
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.StreamHandler()
+    ]
+)
+
+logger = logging.getLogger(__name__)
+
+# Estimativa de tokens da resposta, somada aos tokens do prompt na reserva do orçamento
+EXPECTED_COMPLETION_TOKENS = 500
+
+def load_progress(competition_id: int, season_id: int) -> Dict[str, Any]:
+    """
+        Carrega o progresso de um job anterior da mesma temporada, para retomá-lo.
+    """
+    progress = StatsBombStore.load("summary_jobs", f"{competition_id}_{season_id}")
+    return progress or {"done": [], "failed": {}}
+
+def save_progress(competition_id: int, season_id: int, progress: Dict[str, Any]) -> None:
+    """
+        Grava o progresso do job, após cada partida concluída.
+    """
+    StatsBombStore.save("summary_jobs", f"{competition_id}_{season_id}", progress)
+
+async def summarize_match(
+        match_dict: Dict[str, Any],
+        rate_limiter: RateLimiter,
+        semaphore: asyncio.Semaphore
+    ) -> None:
+    """
+        Gera o resumo de uma partida respeitando o orçamento de requisições e tokens por minuto.
+
+        O resumo é gravado no cache persistente do LLM, de onde /match_summary passa a servi-lo.
+        Partidas que já estão no cache (ex: geradas por /match_summary) não consomem o orçamento.
+    """
+    async with semaphore:
+        encoded_events, _ = await AsyncStatsBombService.run(EventEncoderService.encode_match, match_dict)
+
+        system_prompt = OpenAIClientService._build_match_summary_prompt(match_dict, encoded_events)
+
+        if await LLMCacheService.aget(OPENAI_MODEL, "summary", match_dict['match_id'], None, system_prompt) is not None:
+            return
+
+        prompt_tokens = EventEncoderService.count_tokens(system_prompt)
+        await rate_limiter.acquire(prompt_tokens + EXPECTED_COMPLETION_TOKENS)
+
+        await OpenAIClientService.aget_match_summary(match_dict, encoded_events)
+
+async def summarize_season(
+        competition_id: int,
+        season_id: int,
+        concurrency: int,
+        requests_per_minute: int,
+        tokens_per_minute: int
+    ) -> Dict[str, Any]:
+    """
+        Gera os resumos de todas as partidas de uma temporada, retomando o progresso de execuções anteriores.
+
+        Partidas já concluídas são puladas e as que falharam são tentadas novamente.
+    """
+    matches: List[Dict[str, Any]] = await AsyncStatsBombService.get_matches_dict(competition_id, season_id)
+    progress = load_progress(competition_id, season_id)
+
+    done = set(progress["done"])
+    pending = [match for match in matches if match['match_id'] not in done]
+
+    logger.info(f"{len(matches)} matches, {len(matches) - len(pending)} already processed, {len(pending)} pending.")
+
+    rate_limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+    semaphore = asyncio.Semaphore(concurrency)
+    started_at = time.monotonic()
+
+    async def run(match_dict: Dict[str, Any]) -> None:
+        match_id = match_dict['match_id']
+
+        try:
+            await summarize_match(match_dict, rate_limiter, semaphore)
+            progress["done"].append(match_id)
+            progress["failed"].pop(match_id, None)
+        except Exception as e:
+            logger.error(f"Failed to summarize match_id {match_id}: {e}")
+            progress["failed"][match_id] = str(e)
+
+        save_progress(competition_id, season_id, progress)
+        logger.info(f"[{len(progress['done'])}/{len(matches)}] match_id {match_id} processed, {len(progress['failed'])} failed.")
+
+    await asyncio.gather(*(run(match_dict) for match_dict in pending))
+
+    logger.info(f"Season summarized in {time.monotonic() - started_at:.1f}s.")
+    return progress
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Gera os resumos de todas as partidas de uma competição/temporada.")
+    parser.add_argument("--competition_id", type=int, required=True)
+    parser.add_argument("--season_id", type=int, required=True)
+    parser.add_argument("--concurrency", type=int, default=8, help="Resumos gerados ao mesmo tempo")
+    parser.add_argument("--requests_per_minute", type=int, default=500, help="Orçamento de requisições por minuto")
+    parser.add_argument("--tokens_per_minute", type=int, default=200000, help="Orçamento de tokens por minuto")
+    args = parser.parse_args()
+
+    progress = asyncio.run(summarize_season(
+        args.competition_id,
+        args.season_id,
+        args.concurrency,
+        args.requests_per_minute,
+        args.tokens_per_minute
+    ))
+
+    if progress["failed"]:
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+from dotenv import load_dotenv
+
+# Carregar variáveis de ambiente antes dos serviços, que leem sua configuração na importação
+load_dotenv()
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from service.statsbomb_service import StatsBombService
+from service.statsbomb_store import MAX_CONCURRENCY
+from typing import Dict, Any, List
+import argparse
+import logging
+import time
+
+# Configuração do logger
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.StreamHandler()
+    ]
+)
+
+logger = logging.getLogger(__name__)
+
+def warm_season(competition_id: int, season_id: int, workers: int) -> Dict[str, Any]:
+    """
+        Grava no armazenamento local os eventos e as escalações de todas as partidas de uma temporada.
+
+        As partidas são buscadas em paralelo em um pool limitado de threads, e as que já estão
+        armazenadas são puladas. Retorna o relatório com as contagens, a vazão e as falhas.
+    """
+    matches: List[Dict[str, Any]] = StatsBombService.get_matches_dict(competition_id, season_id)
+    report = {"matches": len(matches), "fetched": 0, "skipped": 0, "failed": {}}
+
+    logger.info(f"Warming {len(matches)} matches of competition_id {competition_id}, season_id {season_id} with {workers} workers.")
+    started_at = time.monotonic()
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="warm_cache") as executor:
+        futures = {
+            executor.submit(StatsBombService.preload_match, match['match_id']): match['match_id']
+            for match in matches
+        }
+
+        for done, future in enumerate(as_completed(futures), start=1):
+            match_id = futures[future]
+
+            try:
+                if future.result():
+                    report["fetched"] += 1
+                else:
+                    report["skipped"] += 1
+            except Exception as e:
+                logger.error(f"Failed to warm match_id {match_id}: {e}")
+                report["failed"][match_id] = str(e)
+
+            logger.info(f"[{done}/{len(matches)}] match_id {match_id} done.")
+
+    elapsed = time.monotonic() - started_at
+    report["seconds"] = round(elapsed, 2)
+    report["matches_per_second"] = round(report["fetched"] / elapsed, 2) if elapsed else 0.0
+
+    logger.info(
+        f"Fetched {report['fetched']} matches, skipped {report['skipped']} already stored and "
+        f"{len(report['failed'])} failed in {report['seconds']}s ({report['matches_per_second']} matches/s)."
+    )
+    return report
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Pré-carrega no armazenamento local os eventos e escalações de uma competição/temporada.")
+    parser.add_argument("--competition_id", type=int, required=True)
+    parser.add_argument("--season_id", type=int, required=True)
+    parser.add_argument("--workers", type=int, default=MAX_CONCURRENCY, help="Partidas buscadas ao mesmo tempo")
+    args = parser.parse_args()
+
+    report = warm_season(args.competition_id, args.season_id, args.workers)
+
+    if report["failed"]:
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
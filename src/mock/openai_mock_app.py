@@ -0,0 +1,117 @@
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import Dict, Any, List, AsyncIterator
+import asyncio
+import random
+import json
+import time
+import os
+
+# Configuração do servidor mock
+MOCK_OPENAI_LATENCY = float(os.getenv("MOCK_OPENAI_LATENCY", 0.5))
+MOCK_OPENAI_TOKEN_DELAY = float(os.getenv("MOCK_OPENAI_TOKEN_DELAY", 0.01))
+MOCK_OPENAI_COMPLETION_TOKENS = int(os.getenv("MOCK_OPENAI_COMPLETION_TOKENS", 200))
+MOCK_OPENAI_ERROR_RATE = float(os.getenv("MOCK_OPENAI_ERROR_RATE", 0))
+
+MOCK_WORDS = [
+    "The", "home", "team", "pressed", "high", "and", "the", "away", "team", "answered",
+    "with", "a", "quick", "counter-attack", "that", "ended", "in", "a", "shot", "on", "target.",
+]
+
+# Servidor local que imita a API de chat completions da OpenAI, para testes de carga sem custo e sem rede.
+# Uso: PYTHONPATH=./src uvicorn src.mock.openai_mock_app:app --port 8001
+#      OPENAI_BASE_URL=http://localhost:8001/v1 OPENAI_API_KEY=mock
+app = FastAPI()
+
+def _build_words(messages: List[Dict[str, Any]]) -> List[str]:
+    """
+        Gera uma resposta determinística com MOCK_OPENAI_COMPLETION_TOKENS palavras.
+    """
+    offset = sum(len(str(message.get("content", ""))) for message in messages) % len(MOCK_WORDS)
+    return [MOCK_WORDS[(offset + i) % len(MOCK_WORDS)] for i in range(MOCK_OPENAI_COMPLETION_TOKENS)]
+
+def _build_usage(messages: List[Dict[str, Any]], completion_tokens: int) -> Dict[str, int]:
+    """
+        Estima o uso de tokens (~4 caracteres por token no prompt).
+    """
+    prompt_tokens = sum(len(str(message.get("content", ""))) for message in messages) // 4
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+    }
+
+async def _stream_chunks(completion_id: str, model: str, words: List[str], usage: Dict[str, int] = None) -> AsyncIterator[str]:
+    """
+        Envia a resposta palavra a palavra no formato SSE da OpenAI, com o uso de tokens no fim se pedido.
+    """
+    for i, word in enumerate(words):
+        await asyncio.sleep(MOCK_OPENAI_TOKEN_DELAY)
+        chunk = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "delta": {"content": word if i == 0 else f" {word}"}, "finish_reason": None}],
+        }
+        yield f"data: {json.dumps(chunk)}\n\n"
+
+    final_chunk = {
+        "id": completion_id,
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+    }
+    yield f"data: {json.dumps(final_chunk)}\n\n"
+
+    if usage is not None:
+        usage_chunk = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [],
+            "usage": usage,
+        }
+        yield f"data: {json.dumps(usage_chunk)}\n\n"
+
+    yield "data: [DONE]\n\n"
+
+@app.post("/v1/chat/completions")
+async def create_chat_completion(request: Dict[str, Any]):
+    """
+        Imita POST /v1/chat/completions, com latência e taxa de erro (429) configuráveis.
+    """
+    if random.random() < MOCK_OPENAI_ERROR_RATE:
+        return JSONResponse(
+            status_code=429,
+            content={"error": {"message": "Rate limit reached (mock)", "type": "rate_limit_error"}}
+        )
+
+    await asyncio.sleep(MOCK_OPENAI_LATENCY)
+
+    model = request.get("model", "mock")
+    messages = request.get("messages", [])
+    words = _build_words(messages)
+    completion_id = f"chatcmpl-mock-{random.getrandbits(32):08x}"
+
+    if request.get("stream"):
+        include_usage = (request.get("stream_options") or {}).get("include_usage")
+        usage = _build_usage(messages, len(words)) if include_usage else None
+        return StreamingResponse(_stream_chunks(completion_id, model, words, usage), media_type="text/event-stream")
+
+    await asyncio.sleep(MOCK_OPENAI_TOKEN_DELAY * len(words))
+
+    return {
+        "id": completion_id,
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": " ".join(words)},
+            "finish_reason": "stop",
+        }],
+        "usage": _build_usage(messages, len(words)),
+    }
@@ -55,6 +55,28 @@ class MatchStats(BaseModel):
     total_goal_keeper: int
     total_bad_behaviour: int
 
+# Tipos de evento contabilizados em MatchStats e o campo correspondente
+MATCH_STATS_FIELDS: Dict[str, str] = {
+    MatchEvents.PASS.value: "total_passes",
+    MatchEvents.BALL_RECEIPT.value: "total_ball_receipts",
+    MatchEvents.CARRY.value: "total_carries",
+    MatchEvents.PRESSURE.value: "total_pressures",
+    MatchEvents.FOUL_COMMITTED.value: "total_fouls_committed",
+    MatchEvents.FOUL_WON.value: "total_fouls_won",
+    MatchEvents.DISPOSSESSED.value: "total_dispossessed",
+    MatchEvents.DUEL.value: "total_duels",
+    MatchEvents.DRIBBLED_PAST.value: "total_dribbled_past",
+    MatchEvents.DRIBBLE.value: "total_dribbles",
+    MatchEvents.BLOCK.value: "total_blocks",
+    MatchEvents.INTERCEPTION.value: "total_interceptions",
+    MatchEvents.BALL_RECOVERY.value: "total_ball_recoveries",
+    MatchEvents.MISCONTROL.value: "total_miscontrols",
+    MatchEvents.SHIELD.value: "total_shields",
+    MatchEvents.SHOT.value: "total_shots",
+    MatchEvents.GOAL_KEEPER.value: "total_goal_keeper",
+    MatchEvents.BAD_BEHAVIOUR.value: "total_bad_behaviour",
+}
+
 class Position(BaseModel):
     position_id: int
     position: str
@@ -78,4 +100,23 @@ class PlayerProfile(BaseModel):
     match_id: int
     match_stats: MatchStats
     player_info: PlayerInfo
-    
\ No newline at end of file
+
+class TeamMatchStats(BaseModel):
+    team: str
+    match_stats: MatchStats
+
+class PlayerMatchStats(BaseModel):
+    player_name: str
+    team: str
+    match_stats: MatchStats
+
+class SeasonPlayerStats(BaseModel):
+    competition_id: int
+    season_id: int
+    player_name: str
+    team: str
+    matches_played: int
+    minutes_played: float
+    season_stats: MatchStats
+    stats_per_90: Dict[str, float]
+    stats_per_match: Dict[str, float]
@@ -0,0 +1,105 @@
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import List, Any, Dict, Callable, Optional, Tuple
+from model.stats_bomb_model import PlayerProfile, SeasonPlayerStats, TeamMatchStats, PlayerMatchStats
+from service.statsbomb_service import StatsBombService
+from service.season_stats_service import SeasonStatsService
+from service.statsbomb_store import MAX_CONCURRENCY
+from service.profiling_service import ProfilingService
+import pandas as pd
+import logging
+
+class AsyncStatsBombService:
+    """
+        Acesso assíncrono ao StatsBombService para as rotas async do FastAPI.
+
+        A statsbombpy é síncrona, então as chamadas rodam em um pool de threads dedicado,
+        cujo tamanho (STATSBOMB_MAX_CONCURRENCY) limita quantas buscas ficam em andamento ao mesmo tempo
+        sem ocupar o threadpool padrão do servidor.
+    """
+    logger = logging.getLogger(__name__)
+
+    _executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENCY, thread_name_prefix="statsbomb")
+
+    @staticmethod
+    async def run(func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+            Executa uma chamada síncrona do serviço no pool de threads da StatsBomb.
+        """
+        return await ProfilingService.run_in_executor(AsyncStatsBombService._executor, partial(func, *args, **kwargs))
+
+    @staticmethod
+    async def get_match_dict(match_id: int, competition_id: Optional[int] = None, season_id: Optional[int] = None) -> Dict[str, Any]:
+        return await AsyncStatsBombService.run(StatsBombService.get_match_dict, match_id, competition_id, season_id)
+
+    @staticmethod
+    async def get_competitions_dict() -> List[Dict[str, Any]]:
+        return await AsyncStatsBombService.run(StatsBombService.get_competitions_dict)
+
+    @staticmethod
+    async def get_matches_dict(competition_id: int, season_id: int) -> List[Dict[str, Any]]:
+        return await AsyncStatsBombService.run(StatsBombService.get_matches_dict, competition_id, season_id)
+
+    @staticmethod
+    async def get_matches_frame(competition_id: int, season_id: int) -> pd.DataFrame:
+        return await AsyncStatsBombService.run(StatsBombService.get_matches_frame, competition_id, season_id)
+
+    @staticmethod
+    async def get_events_dict(
+            match_id: int,
+            event_type_list: List[str] = None,
+            player_name: str = None
+        ) -> List[Dict[str, Any]]:
+        return await AsyncStatsBombService.run(StatsBombService.get_events_dict, match_id, event_type_list, player_name)
+
+    @staticmethod
+    async def get_events_frame(
+            match_id: int,
+            event_type_list: List[str] = None,
+            player_name: str = None
+        ) -> pd.DataFrame:
+        return await AsyncStatsBombService.run(StatsBombService.get_events_frame, match_id, event_type_list, player_name)
+
+    @staticmethod
+    async def get_events_page(
+            match_id: int,
+            event_type_list: List[str] = None,
+            player_name: str = None,
+            cursor: Optional[int] = None,
+            limit: Optional[int] = None,
+            fields: List[str] = None
+        ) -> Tuple[pd.DataFrame, Optional[int]]:
+        return await AsyncStatsBombService.run(
+            StatsBombService.get_events_page, match_id, event_type_list, player_name, cursor, limit, fields
+        )
+
+    @staticmethod
+    async def get_lineups_dict(match_id: int, team: str) -> List[Dict[str, Any]]:
+        return await AsyncStatsBombService.run(StatsBombService.get_lineups_dict, match_id, team)
+
+    @staticmethod
+    async def get_player_profile(match_id: int, player_name: str) -> PlayerProfile:
+        return await AsyncStatsBombService.run(StatsBombService.get_player_profile, match_id, player_name)
+
+    @staticmethod
+    async def get_player_profiles(match_id: int) -> List[PlayerProfile]:
+        return await AsyncStatsBombService.run(StatsBombService.get_player_profiles, match_id)
+
+    @staticmethod
+    async def get_season_player_stats(
+            competition_id: int,
+            season_id: int,
+            player_name: str = None,
+            refresh: bool = False
+        ) -> List[SeasonPlayerStats]:
+        return await AsyncStatsBombService.run(
+            SeasonStatsService.get_season_player_stats, competition_id, season_id, player_name, refresh
+        )
+
+    @staticmethod
+    async def get_team_stats(match_id: int) -> List[TeamMatchStats]:
+        return await AsyncStatsBombService.run(StatsBombService.get_team_stats, match_id)
+
+    @staticmethod
+    async def get_player_stats(match_id: int, team: Optional[str] = None) -> List[PlayerMatchStats]:
+        return await AsyncStatsBombService.run(StatsBombService.get_player_stats, match_id, team)
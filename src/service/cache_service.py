@@ -0,0 +1,201 @@
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+from service.metrics_service import MetricsService
+import threading
+import logging
+import time
+
+class _InFlightCall:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+        Agrupa chamadas concorrentes com a mesma chave: apenas a primeira executa o loader
+        e as demais aguardam e recebem o mesmo resultado (ou a mesma exceção).
+    """
+    logger = logging.getLogger(__name__)
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.executions = 0
+        self.collapsed = 0
+        self._calls: Dict[Hashable, _InFlightCall] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """
+            Executa o loader de uma chave, ou aguarda a execução que já está em andamento.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+
+            if is_leader:
+                call = _InFlightCall()
+                self._calls[key] = call
+                self.executions += 1
+            else:
+                self.collapsed += 1
+
+        if not is_leader:
+            SingleFlight.logger.info(f"Waiting in-flight {self.name} call for {key}.")
+            call.done.wait()
+
+            if call.error is not None:
+                raise call.error
+
+            return call.result
+
+        try:
+            call.result = loader()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+            Obtém os contadores de execuções e chamadas agrupadas.
+        """
+        with self._lock:
+            return {
+                "executions": self.executions,
+                "collapsed": self.collapsed,
+                "in_flight": len(self._calls),
+            }
+
+
+class LRUCache:
+    """
+        Cache em memória com política LRU, tamanho máximo e TTL opcional.
+
+        É thread-safe, para poder ser compartilhado entre os workers do FastAPI,
+        as sessões do Streamlit e as tools do agente no mesmo processo.
+    """
+    logger = logging.getLogger(__name__)
+
+    def __init__(self, name: str, maxsize: int = 128, ttl: Optional[float] = None) -> None:
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._single_flight = SingleFlight(name)
+        MetricsService.register_cache(self)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return self._get_entry(key) is not None
+
+    def _get_entry(self, key: Hashable) -> Optional[tuple[float, Any]]:
+        """
+            Retorna a entrada de uma chave, descartando-a se estiver expirada. Deve ser chamado com o lock.
+        """
+        entry = self._entries.get(key)
+
+        if entry is None:
+            return None
+
+        if self.ttl is not None and time.monotonic() - entry[0] > self.ttl:
+            del self._entries[key]
+            return None
+
+        return entry
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+            Obtém um valor do cache, atualizando os contadores de hit/miss.
+        """
+        with self._lock:
+            entry = self._get_entry(key)
+
+            if entry is None:
+                self.misses += 1
+                return default
+
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+            Grava um valor no cache, removendo o menos usado recentemente se o limite for atingido.
+        """
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_set(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """
+            Obtém um valor do cache, ou o carrega e grava caso não exista.
+
+            Misses concorrentes da mesma chave compartilham uma única execução do loader.
+        """
+        with self._lock:
+            entry = self._get_entry(key)
+
+            if entry is not None:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return entry[1]
+
+            self.misses += 1
+
+        # O loader roda fora do lock para não bloquear leituras de outras chaves
+        return self._single_flight.do(key, lambda: self._load(key, loader))
+
+    def _load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """
+            Carrega e grava o valor de uma chave, executado apenas pela primeira chamada em andamento.
+        """
+        value = loader()
+        self.set(key, value)
+        return value
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """
+            Remove uma chave do cache, ou todas se nenhuma for informada.
+        """
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+            Obtém os contadores do cache.
+        """
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                "name": self.name,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / requests if requests else 0.0,
+                **self._single_flight.get_stats(),
+            }
@@ -0,0 +1,194 @@
+from functools import lru_cache
+from typing import List, Dict, Any, Tuple, Optional
+from model.stats_bomb_model import MatchEvents
+from service.statsbomb_service import StatsBombService
+import pandas as pd
+import logging
+import json
+import os
+
+# Orçamento de tokens dos eventos enviados nos prompts do LLM
+LLM_EVENTS_TOKEN_BUDGET = int(os.getenv("LLM_EVENTS_TOKEN_BUDGET", 6000))
+
+GOAL = "Goal"
+
+# Limite inferior de tokens por evento codificado ({"m":1,"s":2}, com a vírgula), usado para descartar
+# grupos grandes que não cabem no orçamento sem serializá-los e tokenizá-los
+MIN_TOKENS_PER_EVENT = 3
+
+# Grupos de eventos em ordem de prioridade: gols primeiro, depois os demais chutes e os lances mais relevantes
+EVENT_PRIORITY: List[str] = [
+    GOAL,
+    MatchEvents.SHOT.value,
+    MatchEvents.BAD_BEHAVIOUR.value,
+    MatchEvents.FOUL_COMMITTED.value,
+    MatchEvents.SUBSTITUTION.value,
+    MatchEvents.GOAL_KEEPER.value,
+    MatchEvents.DRIBBLE.value,
+    MatchEvents.INTERCEPTION.value,
+    MatchEvents.BLOCK.value,
+    MatchEvents.DUEL.value,
+    MatchEvents.FOUL_WON.value,
+    MatchEvents.DISPOSSESSED.value,
+    MatchEvents.BALL_RECOVERY.value,
+    MatchEvents.CLEARANCE.value,
+    MatchEvents.MISCONTROL.value,
+    MatchEvents.PRESSURE.value,
+    MatchEvents.CARRY.value,
+    MatchEvents.PASS.value,
+]
+
+# Colunas projetadas em todos os eventos e suas abreviações
+COMMON_FIELDS: Dict[str, str] = {
+    "minute": "m",
+    "second": "s",
+    "team": "tm",
+    "player": "pl",
+}
+
+# Colunas específicas de cada tipo de evento e suas abreviações
+TYPE_FIELDS: Dict[str, Dict[str, str]] = {
+    GOAL: {"shot_statsbomb_xg": "xg", "shot_type": "st", "shot_body_part": "bp"},
+    MatchEvents.SHOT.value: {"shot_outcome": "o", "shot_statsbomb_xg": "xg", "shot_type": "st", "shot_body_part": "bp"},
+    MatchEvents.BAD_BEHAVIOUR.value: {"bad_behaviour_card": "card"},
+    MatchEvents.FOUL_COMMITTED.value: {"foul_committed_card": "card", "foul_committed_penalty": "pen"},
+    MatchEvents.SUBSTITUTION.value: {"substitution_replacement": "in"},
+    MatchEvents.GOAL_KEEPER.value: {"goalkeeper_type": "gk", "goalkeeper_outcome": "o"},
+    MatchEvents.DRIBBLE.value: {"dribble_outcome": "o"},
+    MatchEvents.INTERCEPTION.value: {"interception_outcome": "o"},
+    MatchEvents.DUEL.value: {"duel_type": "dt", "duel_outcome": "o"},
+    MatchEvents.PASS.value: {"pass_recipient": "to", "pass_outcome": "o", "pass_goal_assist": "ga"},
+}
+
+LEGEND = (
+    "m=minute, s=second, tm=team, pl=player, o=outcome, xg=expected goals, st=shot type, bp=body part, "
+    "card=card, pen=penalty, in=replacement, gk=goalkeeper action, dt=duel type, to=recipient, ga=goal assist"
+)
+
+class EventEncoderService:
+    """
+        Codificação compacta dos eventos de uma partida para os prompts do LLM.
+
+        Projeta os eventos em um esquema reduzido com chaves abreviadas, remove campos vazios
+        e inclui grupos de eventos por ordem de prioridade enquanto couberem no orçamento de tokens.
+    """
+    logger = logging.getLogger(__name__)
+
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def _get_encoding() -> Any:
+        """
+            Obtém o tokenizer do modelo, ou None se não estiver disponível.
+        """
+        try:
+            import tiktoken
+            return tiktoken.get_encoding("o200k_base")
+        except Exception as e:
+            EventEncoderService.logger.warning(f"Tokenizer not available, estimating tokens by length: {e}")
+            return None
+
+    @staticmethod
+    def count_tokens(text: str) -> int:
+        """
+            Conta os tokens de um texto (ou estima, com ~4 caracteres por token, sem o tokenizer).
+        """
+        encoding = EventEncoderService._get_encoding()
+
+        if encoding is None:
+            return len(text) // 4 + 1
+
+        return len(encoding.encode(text))
+
+    @staticmethod
+    def _encode_group(events: pd.DataFrame, group: str, teams: Dict[str, str]) -> Optional[str]:
+        """
+            Codifica um grupo de eventos em uma linha: "<grupo>: [{...}, ...]", ou None se o grupo estiver vazio.
+        """
+        if events.empty:
+            return None
+
+        fields = {**COMMON_FIELDS, **TYPE_FIELDS.get(group, {})}
+        events = events[[column for column in fields if column in events.columns]].rename(columns=fields)
+
+        if 'tm' in events.columns:
+            team_names = events['tm'].astype(object)
+            events = events.assign(tm=team_names.map(teams).fillna(team_names))
+
+        if 'xg' in events.columns:
+            events = events.assign(xg=events['xg'].round(2))
+
+        records = [
+            {key: value for key, value in record.items() if value is not None}
+            for record in StatsBombService.to_records(events)
+        ]
+        return f"{group}: {json.dumps(records, separators=(',', ':'), ensure_ascii=False)}"
+
+    @staticmethod
+    def encode_match_events(
+            match_dict: Dict[str, Any],
+            events: pd.DataFrame,
+            token_budget: int = None
+        ) -> Tuple[str, List[str]]:
+        """
+            Codifica os eventos de uma partida dentro do orçamento de tokens.
+
+            Retorna o texto codificado e a lista dos grupos de eventos incluídos.
+        """
+        token_budget = token_budget or LLM_EVENTS_TOKEN_BUDGET
+        teams = {match_dict['home_team']: "H", match_dict['away_team']: "A"}
+
+        events = events.sort_values('index')
+        is_goal = (events['type'] == MatchEvents.SHOT.value) & (events.get('shot_outcome') == GOAL)
+
+        header = f"legend: {LEGEND}, H={match_dict['home_team']}, A={match_dict['away_team']}"
+        lines = [header]
+        used_tokens = EventEncoderService.count_tokens(header)
+        included_groups: List[str] = []
+
+        for group in EVENT_PRIORITY:
+            if group == GOAL:
+                group_events = events[is_goal]
+            else:
+                group_events = events[(events['type'] == group) & ~is_goal]
+
+            if group_events.empty:
+                continue
+
+            # Estimativa barata: se nem o mínimo de tokens por evento cabe, o grupo nem é serializado
+            if used_tokens + len(group_events) * MIN_TOKENS_PER_EVENT > token_budget:
+                continue
+
+            line = EventEncoderService._encode_group(group_events, group, teams)
+            line_tokens = EventEncoderService.count_tokens(line)
+
+            # Grupos que não cabem são ignorados, mas grupos menores de menor prioridade ainda podem caber
+            if used_tokens + line_tokens > token_budget:
+                continue
+
+            lines.append(line)
+            used_tokens += line_tokens
+            included_groups.append(group)
+
+        EventEncoderService.logger.info(f"Encoded event groups {included_groups} in {used_tokens} tokens (budget {token_budget})")
+
+        return "\n".join(lines), included_groups
+
+    @staticmethod
+    def encode_match(match_dict: Dict[str, Any], token_budget: int = None) -> Tuple[str, List[str]]:
+        """
+            Codifica os eventos de uma partida (ver encode_match_events), uma vez por partida e orçamento.
+
+            O prompt codificado também é a chave do cache do LLM, então é montado a cada resumo ou narração,
+            mesmo quando a resposta já está no cache.
+        """
+        token_budget = token_budget or LLM_EVENTS_TOKEN_BUDGET
+        match_id = match_dict['match_id']
+
+        return StatsBombService.caches["encoded_events"].get_or_set(
+            f"{match_id}_{token_budget}",
+            lambda: EventEncoderService.encode_match_events(
+                match_dict,
+                StatsBombService.get_events_frame(match_id),
+                token_budget
+            )
+        )
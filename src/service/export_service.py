@@ -0,0 +1,89 @@
+from typing import Callable, Dict, Optional
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pandas as pd
+import logging
+import json
+
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+PARQUET_MEDIA_TYPE = "application/vnd.apache.parquet"
+
+class ExportService:
+    """
+        Exportação de DataFrames em formatos colunares binários (Arrow IPC e Parquet).
+    """
+    logger = logging.getLogger(__name__)
+
+    @staticmethod
+    def to_arrow_table(frame: pd.DataFrame) -> pa.Table:
+        """
+            Converte um DataFrame em tabela Arrow, coluna a coluna.
+
+            Colunas com tipos mistos que o Arrow não consegue inferir são serializadas como JSON.
+        """
+        arrays = []
+
+        for column in frame.columns:
+            try:
+                arrays.append(pa.array(frame[column], from_pandas=True))
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                ExportService.logger.warning(f"Column {column} has mixed types, exporting it as JSON.")
+                arrays.append(pa.array(
+                    [None if pd.isna(value) is True else json.dumps(value, default=str) for value in frame[column]],
+                    type=pa.string()
+                ))
+
+        return pa.Table.from_arrays(arrays, names=[str(column) for column in frame.columns])
+
+    @staticmethod
+    def to_arrow_ipc(frame: pd.DataFrame) -> bytes:
+        """
+            Serializa um DataFrame no formato Arrow IPC (stream).
+        """
+        table = ExportService.to_arrow_table(frame)
+        sink = pa.BufferOutputStream()
+
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+
+        return sink.getvalue().to_pybytes()
+
+    @staticmethod
+    def to_parquet(frame: pd.DataFrame) -> bytes:
+        """
+            Serializa um DataFrame no formato Parquet.
+        """
+        sink = pa.BufferOutputStream()
+        pq.write_table(ExportService.to_arrow_table(frame), sink)
+        return sink.getvalue().to_pybytes()
+
+    # Formatos suportados: media type -> serializador
+    FORMATS: Dict[str, Callable[[pd.DataFrame], bytes]] = {
+        ARROW_STREAM_MEDIA_TYPE: to_arrow_ipc,
+        PARQUET_MEDIA_TYPE: to_parquet,
+    }
+
+    @staticmethod
+    def negotiate(accept: Optional[str]) -> Optional[str]:
+        """
+            Escolhe o formato binário pedido no header Accept, ou None para manter o JSON padrão.
+        """
+        if not accept:
+            return None
+
+        for media_type in accept.split(","):
+            media_type = media_type.split(";")[0].strip().lower()
+
+            if media_type in ExportService.FORMATS:
+                return media_type
+
+        return None
+
+    @staticmethod
+    def export(frame: pd.DataFrame, media_type: str) -> bytes:
+        """
+            Serializa um DataFrame no formato do media type informado.
+        """
+        ExportService.logger.info(f"Exporting {len(frame)} rows as {media_type}")
+
+        return ExportService.FORMATS[media_type](frame)
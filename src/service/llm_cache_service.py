@@ -0,0 +1,138 @@
+from typing import Optional
+from service.metrics_service import MetricsService
+import threading
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import time
+import os
+
+# Configuração do cache persistente de respostas do LLM
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", ".llm_cache.sqlite3")
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL")) if os.getenv("LLM_CACHE_TTL") else None
+
+class LLMCacheService:
+    """
+        Cache persistente (SQLite) das respostas do LLM para resumos e narrações de partidas.
+
+        A chave é composta por modelo, tipo de geração, match_id, estilo e o hash do prompt renderizado,
+        então qualquer mudança no prompt ou nos eventos enviados gera uma nova entrada.
+
+        As versões assíncronas (aget, aset, ainvalidate) executam o acesso ao SQLite, que pode aguardar
+        o lock do arquivo por até 30 segundos, no pool de threads padrão, fora do event loop.
+    """
+    logger = logging.getLogger(__name__)
+
+    _local = threading.local()
+
+    @staticmethod
+    def _get_connection() -> sqlite3.Connection:
+        """
+            Obtém a conexão SQLite da thread atual, criando a tabela na primeira vez.
+        """
+        connection = getattr(LLMCacheService._local, "connection", None)
+
+        if connection is None:
+            connection = sqlite3.connect(LLM_CACHE_PATH, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    model TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    match_id INTEGER NOT NULL,
+                    style TEXT NOT NULL,
+                    prompt_hash TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (model, kind, match_id, style, prompt_hash)
+                )
+            """)
+            connection.commit()
+            LLMCacheService._local.connection = connection
+
+        return connection
+
+    @staticmethod
+    def hash_prompt(prompt: str) -> str:
+        """
+            Calcula o hash do prompt renderizado.
+        """
+        return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def get(model: str, kind: str, match_id: int, style: Optional[str], prompt: str) -> Optional[str]:
+        """
+            Obtém uma resposta do cache, ou None caso não exista ou esteja expirada.
+        """
+        row = LLMCacheService._get_connection().execute(
+            """
+                SELECT response, created_at FROM llm_cache
+                WHERE model = ? AND kind = ? AND match_id = ? AND style = ? AND prompt_hash = ?
+            """,
+            (model, kind, match_id, style or "", LLMCacheService.hash_prompt(prompt))
+        ).fetchone()
+
+        if row is None:
+            MetricsService.inc("llm_cache_requests_total", kind=kind, result="miss")
+            return None
+
+        response, created_at = row
+
+        if LLM_CACHE_TTL is not None and time.time() - created_at > LLM_CACHE_TTL:
+            MetricsService.inc("llm_cache_requests_total", kind=kind, result="miss")
+            return None
+
+        MetricsService.inc("llm_cache_requests_total", kind=kind, result="hit")
+        LLMCacheService.logger.info(f"Serving {kind} for match_id {match_id} from LLM cache.")
+        return response
+
+    @staticmethod
+    def set(model: str, kind: str, match_id: int, style: Optional[str], prompt: str, response: str) -> None:
+        """
+            Grava uma resposta no cache.
+        """
+        connection = LLMCacheService._get_connection()
+        connection.execute(
+            "INSERT OR REPLACE INTO llm_cache VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (model, kind, match_id, style or "", LLMCacheService.hash_prompt(prompt), response, time.time())
+        )
+        connection.commit()
+
+    @staticmethod
+    async def aget(model: str, kind: str, match_id: int, style: Optional[str], prompt: str) -> Optional[str]:
+        return await asyncio.to_thread(LLMCacheService.get, model, kind, match_id, style, prompt)
+
+    @staticmethod
+    async def aset(model: str, kind: str, match_id: int, style: Optional[str], prompt: str, response: str) -> None:
+        await asyncio.to_thread(LLMCacheService.set, model, kind, match_id, style, prompt, response)
+
+    @staticmethod
+    def invalidate(match_id: Optional[int] = None, kind: Optional[str] = None) -> int:
+        """
+            Remove as respostas de uma partida e/ou tipo de geração, ou todas se nada for informado.
+
+            Retorna o número de entradas removidas.
+        """
+        conditions, params = [], []
+
+        if match_id is not None:
+            conditions.append("match_id = ?")
+            params.append(match_id)
+
+        if kind is not None:
+            conditions.append("kind = ?")
+            params.append(kind)
+
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        connection = LLMCacheService._get_connection()
+        deleted = connection.execute(f"DELETE FROM llm_cache{where}", params).rowcount
+        connection.commit()
+
+        LLMCacheService.logger.info(f"Invalidated {deleted} LLM cache entries for match_id {match_id}, kind {kind}")
+        return deleted
+
+    @staticmethod
+    async def ainvalidate(match_id: Optional[int] = None, kind: Optional[str] = None) -> int:
+        return await asyncio.to_thread(LLMCacheService.invalidate, match_id, kind)
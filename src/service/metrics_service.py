@@ -0,0 +1,199 @@
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+import threading
+import bisect
+import logging
+import time
+
+# Buckets dos histogramas de latência (segundos) e de tamanho de payload (bytes)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SIZE_BUCKETS = (1_000, 10_000, 100_000, 1_000_000, 10_000_000, 100_000_000)
+
+# Métricas expostas em /metrics: nome -> (tipo, descrição, buckets dos histogramas)
+METRICS: Dict[str, Tuple[str, str, Tuple[float, ...]]] = {
+    "http_request_duration_seconds": ("histogram", "HTTP request latency by route (time until the response headers).", LATENCY_BUCKETS),
+    "http_response_size_bytes": ("histogram", "HTTP response body size by route, when known.", SIZE_BUCKETS),
+    "upstream_request_duration_seconds": ("histogram", "Latency of calls to upstream services (StatsBomb, OpenAI).", LATENCY_BUCKETS),
+    "upstream_errors_total": ("counter", "Failed calls to upstream services.", ()),
+    "llm_tokens_total": ("counter", "LLM tokens used, by model, generation kind and token type.", ()),
+    "llm_cache_requests_total": ("counter", "LLM response cache lookups, by generation kind and result.", ()),
+    "cache_requests_total": ("counter", "In-memory cache lookups, by cache and result.", ()),
+    "cache_hit_ratio": ("gauge", "In-memory cache hit ratio since the process started.", ()),
+    "cache_size": ("gauge", "Entries currently in the in-memory cache.", ()),
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+class MetricsService:
+    """
+        Registro de métricas do processo, exposto no formato texto do Prometheus em /metrics.
+
+        Os serviços registram contadores e observações de histogramas por meio de inc, observe
+        e track_upstream. As métricas são por processo: com vários workers do uvicorn, cada um
+        expõe as suas.
+    """
+    logger = logging.getLogger(__name__)
+
+    _lock = threading.Lock()
+    _counters: Dict[str, Dict[Labels, float]] = {}
+    _histograms: Dict[str, Dict[Labels, List[float]]] = {}
+    _caches: List[Any] = []
+
+    @staticmethod
+    def _get_labels(labels: Dict[str, Any]) -> Labels:
+        return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+    @staticmethod
+    def inc(name: str, value: float = 1, **labels: Any) -> None:
+        """
+            Incrementa um contador.
+        """
+        key = MetricsService._get_labels(labels)
+
+        with MetricsService._lock:
+            series = MetricsService._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    @staticmethod
+    def observe(name: str, value: float, **labels: Any) -> None:
+        """
+            Registra uma observação em um histograma.
+
+            O estado de cada série é [contagem por bucket..., soma, contagem total].
+        """
+        buckets = METRICS[name][2]
+        key = MetricsService._get_labels(labels)
+
+        with MetricsService._lock:
+            series = MetricsService._histograms.setdefault(name, {})
+            state = series.get(key)
+
+            if state is None:
+                state = series[key] = [0.0] * (len(buckets) + 2)
+
+            bucket = bisect.bisect_left(buckets, value)
+
+            if bucket < len(buckets):
+                state[bucket] += 1
+
+            state[-2] += value
+            state[-1] += 1
+
+    @staticmethod
+    @contextmanager
+    def track_upstream(upstream: str, operation: str) -> Iterator[None]:
+        """
+            Mede a latência de uma chamada a um serviço externo e conta as falhas pelo tipo do erro.
+        """
+        started_at = time.perf_counter()
+
+        try:
+            yield
+        except Exception as e:
+            MetricsService.inc("upstream_errors_total", upstream=upstream, operation=operation, error=type(e).__name__)
+            raise
+        finally:
+            MetricsService.observe(
+                "upstream_request_duration_seconds",
+                time.perf_counter() - started_at,
+                upstream=upstream,
+                operation=operation
+            )
+
+    @staticmethod
+    def call_upstream(upstream: str, operation: str, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+            Executa uma chamada a um serviço externo dentro de track_upstream.
+        """
+        with MetricsService.track_upstream(upstream, operation):
+            return func(*args, **kwargs)
+
+    @staticmethod
+    def record_llm_usage(model: str, kind: str, usage: Any) -> None:
+        """
+            Soma os tokens de prompt e de resposta informados pela API em uma chamada ao LLM.
+        """
+        if usage is None:
+            return
+
+        MetricsService.inc("llm_tokens_total", usage.prompt_tokens, model=model, kind=kind, type="prompt")
+        MetricsService.inc("llm_tokens_total", usage.completion_tokens, model=model, kind=kind, type="completion")
+
+    @staticmethod
+    def register_cache(cache: Any) -> None:
+        """
+            Registra um cache em memória, cujos contadores (get_stats) são lidos a cada coleta.
+        """
+        with MetricsService._lock:
+            MetricsService._caches.append(cache)
+
+    @staticmethod
+    def _format_labels(labels: Labels, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+        labels = labels + extra
+
+        if not labels:
+            return ""
+
+        def escape(value: str) -> str:
+            return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+        return "{" + ",".join(f'{name}="{escape(value)}"' for name, value in labels) + "}"
+
+    @staticmethod
+    def _format_value(value: float) -> str:
+        return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+    @staticmethod
+    def _collect_caches() -> Tuple[Dict[str, Dict[Labels, float]], Dict[str, Dict[Labels, float]]]:
+        """
+            Lê os contadores dos caches registrados, como contadores e gauges.
+        """
+        counters: Dict[str, Dict[Labels, float]] = {"cache_requests_total": {}}
+        gauges: Dict[str, Dict[Labels, float]] = {"cache_hit_ratio": {}, "cache_size": {}}
+
+        for cache in list(MetricsService._caches):
+            stats = cache.get_stats()
+            cache_labels = (("cache", stats["name"]),)
+
+            counters["cache_requests_total"][cache_labels + (("result", "hit"),)] = stats["hits"]
+            counters["cache_requests_total"][cache_labels + (("result", "miss"),)] = stats["misses"]
+            gauges["cache_hit_ratio"][cache_labels] = stats["hit_ratio"]
+            gauges["cache_size"][cache_labels] = stats["size"]
+
+        return counters, gauges
+
+    @staticmethod
+    def render() -> str:
+        """
+            Gera o texto de todas as métricas no formato de exposição do Prometheus (versão 0.0.4).
+        """
+        cache_counters, gauges = MetricsService._collect_caches()
+        lines: List[str] = []
+
+        with MetricsService._lock:
+            counters = {**{name: dict(series) for name, series in MetricsService._counters.items()}, **cache_counters}
+            histograms = {name: {key: list(state) for key, state in series.items()} for name, series in MetricsService._histograms.items()}
+
+        for name, (metric_type, description, buckets) in METRICS.items():
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} {metric_type}")
+
+            if metric_type == "histogram":
+                for labels, state in sorted(histograms.get(name, {}).items()):
+                    cumulative = 0.0
+
+                    for bound, count in zip(buckets, state):
+                        cumulative += count
+                        le = MetricsService._format_value(bound)
+                        lines.append(f"{name}_bucket{MetricsService._format_labels(labels, (('le', le),))} {MetricsService._format_value(cumulative)}")
+
+                    lines.append(f"{name}_bucket{MetricsService._format_labels(labels, (('le', '+Inf'),))} {MetricsService._format_value(state[-1])}")
+                    lines.append(f"{name}_sum{MetricsService._format_labels(labels)} {MetricsService._format_value(state[-2])}")
+                    lines.append(f"{name}_count{MetricsService._format_labels(labels)} {MetricsService._format_value(state[-1])}")
+            else:
+                series = counters.get(name) if metric_type == "counter" else gauges.get(name)
+
+                for labels, value in sorted((series or {}).items()):
+                    lines.append(f"{name}{MetricsService._format_labels(labels)} {MetricsService._format_value(value)}")
+
+        return "\n".join(lines) + "\n"
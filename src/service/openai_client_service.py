@@ -1,9 +1,22 @@
-import openai
-from openai import OpenAI, OpenAIError
-from typing import List, Dict, Any, Literal
+from openai import OpenAI, AsyncOpenAI, OpenAIError
+from typing import List, Dict, Any, Literal, Optional, Iterator, AsyncIterator, Union
+from service.llm_cache_service import LLMCacheService
+from service.metrics_service import MetricsService
+import threading
+import asyncio
+import weakref
+import httpx
 import logging
 import os
 
+OPENAI_MODEL = "gpt-4o-mini"
+
+# Configuração dos clientes da OpenAI (OPENAI_BASE_URL permite apontar para o servidor mock local)
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL") or None
+OPENAI_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", 60))
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", 3))
+OPENAI_MAX_CONCURRENCY = int(os.getenv("OPENAI_MAX_CONCURRENCY", 16))
+
 class OpenAIClientError(Exception):
     def __init__(self, message: str) -> None:
         self.message = message
@@ -12,58 +25,100 @@ class OpenAIClientError(Exception):
 class OpenAIClientService:
     logger = logging.getLogger(__name__)
     
+    _client: OpenAI = None
+    _async_clients: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+    _client_lock = threading.Lock()
+    
     @staticmethod
-    def get_chat_response(user_message: str) -> str:
+    def _get_client_options() -> Dict[str, Any]:
         """
-            Obtém uma resposta de chat do OpenAI GPT-4.
+            Configuração comum dos clientes síncrono e assíncrono da OpenAI.
+            
+            O SDK já refaz as chamadas com backoff exponencial em erros de conexão, 429 e 5xx.
         """
-        
-        OpenAIClientService.logger.info("Getting chat response.")
-        
         api_key = os.getenv("OPENAI_API_KEY")
         
         if not api_key:
             raise OpenAIClientError("OPEN AI API Key is required.")
         
-        openai.api_key = api_key
-        client: OpenAI = openai
+        return {
+            "api_key": api_key,
+            "base_url": OPENAI_BASE_URL,
+            "timeout": httpx.Timeout(OPENAI_TIMEOUT, connect=5.0),
+            "max_retries": OPENAI_MAX_RETRIES,
+        }
+    
+    @staticmethod
+    def _get_client() -> OpenAI:
+        """
+            Obtém o cliente síncrono da OpenAI, criado uma única vez e compartilhado entre as threads.
+        """
+        with OpenAIClientService._client_lock:
+            if OpenAIClientService._client is None:
+                OpenAIClientService._client = OpenAI(
+                    **OpenAIClientService._get_client_options(),
+                    http_client=httpx.Client(
+                        limits=httpx.Limits(
+                            max_connections=OPENAI_MAX_CONCURRENCY,
+                            max_keepalive_connections=OPENAI_MAX_CONCURRENCY
+                        )
+                    )
+                )
+        
+        return OpenAIClientService._client
+    
+    @staticmethod
+    def _get_async_client() -> AsyncOpenAI:
+        """
+            Obtém o cliente assíncrono da OpenAI do event loop atual, com um pool de conexões limitado.
+            
+            As conexões do httpx ficam presas ao loop em que foram abertas, por isso há um cliente por loop
+            (na prática, um único cliente por worker do uvicorn).
+        """
+        loop = asyncio.get_running_loop()
+        
+        with OpenAIClientService._client_lock:
+            async_client = OpenAIClientService._async_clients.get(loop)
+            
+            if async_client is None:
+                async_client = AsyncOpenAI(
+                    **OpenAIClientService._get_client_options(),
+                    http_client=httpx.AsyncClient(
+                        limits=httpx.Limits(
+                            max_connections=OPENAI_MAX_CONCURRENCY,
+                            max_keepalive_connections=OPENAI_MAX_CONCURRENCY
+                        )
+                    )
+                )
+                OpenAIClientService._async_clients[loop] = async_client
+        
+        return async_client
+    
+    @staticmethod
+    async def _aget_completion(messages: List[Dict[str, str]], kind: str = "chat") -> str:
+        """
+            Obtém uma resposta do modelo de forma assíncrona.
+        """
+        client = OpenAIClientService._get_async_client()
         
         try:
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a helpful assistant."
-                    },
-                    {
-                        "role": "user",
-                        "content": user_message
-                    }
-                ]
-            )
+            with MetricsService.track_upstream("openai", kind):
+                response = await client.chat.completions.create(
+                    model=OPENAI_MODEL,
+                    messages=messages
+                )
+            MetricsService.record_llm_usage(OPENAI_MODEL, kind, response.usage)
             return response.choices[0].message.content
         except OpenAIError as e:
             OpenAIClientService.logger.error(f"Failed to get chat response: {e}")
             raise OpenAIClientError(f"Failed to get chat response: {e}")
-        
-        
+    
     @staticmethod
-    def get_match_summary(match_dict: List[Dict[str, Any]], events_dict: List[Dict[str, Any]]) -> str:
+    def _build_match_summary_prompt(match_dict: List[Dict[str, Any]], events_dict: Union[str, List[Dict[str, Any]]]) -> str:
         """
-            Obtém um resumo de uma partida de futebol, utilizando o OpenAI GPT-4.
+            Monta o prompt de sistema do resumo de uma partida.
         """
-        OpenAIClientService.logger.info("Getting match summary.")
-        
-        api_key = os.getenv("OPENAI_API_KEY")
-        
-        if not api_key:
-            raise OpenAIClientError("OPEN AI API Key is required.")
-        
-        openai.api_key = api_key
-        client: OpenAI = openai
-        
-        system_prompt = f"""
+        return f"""
             You are a sports journalist writing a match summary for a sports website.
             
             Utilize the information below to write a summary of the match between the home team and the away team.
@@ -80,43 +135,17 @@ class OpenAIClientService:
                 The away team fought back and equalized in the second half with a goal from their midfielder David Luiz.
                 However, the home team clinched the win with a decisive late goal from their winger Robinho.
         """
-        
-        try:
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": system_prompt
-                    }
-                ]
-            )
-            return response.choices[0].message.content
-        except OpenAIError as e:
-            OpenAIClientService.logger.error(f"Failed to get chat response: {e}")
-            raise OpenAIClientError(f"Failed to get chat response: {e}")
-        
+
     @staticmethod
-    def get_match_narration(
+    def _build_match_narration_prompt(
             match_dict: List[Dict[str, Any]],
-            events_dict: List[Dict[str, Any]],
+            events_dict: Union[str, List[Dict[str, Any]]],
             style: Literal["Formal", "Humorous", "Technical"] = "Formal"
         ) -> str:
         """
-            Obtém uma narração de uma partida de futebol, utilizando o OpenAI GPT-4.
+            Monta o prompt de sistema da narração de uma partida.
         """
-        
-        OpenAIClientService.logger.info("Getting match narration.")
-        
-        api_key = os.getenv("OPENAI_API_KEY")
-        
-        if not api_key:
-            raise OpenAIClientError("OPEN AI API Key is required.")
-        
-        openai.api_key = api_key
-        client: OpenAI = openai
-        
-        system_prompt = f"""
+        return f"""
             You are a sports commentator narrating a live broadcast of a football match between the home team and the away team.
             
             Utilize the information below to provide a detailed and engaging narration of the match.
@@ -133,18 +162,277 @@ class OpenAIClientService:
                 The away team is not to be underestimated, with their solid defense and swift counter-attacks.
                 Stay tuned for all the action as it unfolds in this exciting match!
         """
+
+    @staticmethod
+    def get_chat_response(user_message: str) -> str:
+        """
+            Obtém uma resposta de chat do OpenAI GPT-4.
+        """
+        
+        OpenAIClientService.logger.info("Getting chat response.")
+        
+        client = OpenAIClientService._get_client()
         
         try:
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": system_prompt
-                    }
-                ]
-            )
+            with MetricsService.track_upstream("openai", "chat"):
+                response = client.chat.completions.create(
+                    model=OPENAI_MODEL,
+                    messages=[
+                        {
+                            "role": "system",
+                            "content": "You are a helpful assistant."
+                        },
+                        {
+                            "role": "user",
+                            "content": user_message
+                        }
+                    ]
+                )
+            MetricsService.record_llm_usage(OPENAI_MODEL, "chat", response.usage)
             return response.choices[0].message.content
         except OpenAIError as e:
             OpenAIClientService.logger.error(f"Failed to get chat response: {e}")
-            raise OpenAIClientError(f"Failed to get chat response: {e}")
\ No newline at end of file
+            raise OpenAIClientError(f"Failed to get chat response: {e}")
+        
+        
+    @staticmethod
+    def get_match_summary(match_dict: List[Dict[str, Any]], events_dict: Union[str, List[Dict[str, Any]]]) -> str:
+        """
+            Obtém um resumo de uma partida de futebol, utilizando o OpenAI GPT-4.
+        """
+        OpenAIClientService.logger.info("Getting match summary.")
+        
+        client = OpenAIClientService._get_client()
+        
+        system_prompt = OpenAIClientService._build_match_summary_prompt(match_dict, events_dict)
+        
+        summary = LLMCacheService.get(OPENAI_MODEL, "summary", match_dict['match_id'], None, system_prompt)
+        
+        if summary is not None:
+            return summary
+        
+        try:
+            with MetricsService.track_upstream("openai", "summary"):
+                response = client.chat.completions.create(
+                    model=OPENAI_MODEL,
+                    messages=[
+                        {
+                            "role": "system",
+                            "content": system_prompt
+                        }
+                    ]
+                )
+            MetricsService.record_llm_usage(OPENAI_MODEL, "summary", response.usage)
+            summary = response.choices[0].message.content
+            LLMCacheService.set(OPENAI_MODEL, "summary", match_dict['match_id'], None, system_prompt, summary)
+            return summary
+        except OpenAIError as e:
+            OpenAIClientService.logger.error(f"Failed to get chat response: {e}")
+            raise OpenAIClientError(f"Failed to get chat response: {e}")
+        
+    @staticmethod
+    def get_match_narration(
+            match_dict: List[Dict[str, Any]],
+            events_dict: Union[str, List[Dict[str, Any]]],
+            style: Literal["Formal", "Humorous", "Technical"] = "Formal"
+        ) -> str:
+        """
+            Obtém uma narração de uma partida de futebol, utilizando o OpenAI GPT-4.
+        """
+        
+        OpenAIClientService.logger.info("Getting match narration.")
+        
+        client = OpenAIClientService._get_client()
+        
+        system_prompt = OpenAIClientService._build_match_narration_prompt(match_dict, events_dict, style)
+        
+        narration = LLMCacheService.get(OPENAI_MODEL, "narration", match_dict['match_id'], style, system_prompt)
+        
+        if narration is not None:
+            return narration
+        
+        try:
+            with MetricsService.track_upstream("openai", "narration"):
+                response = client.chat.completions.create(
+                    model=OPENAI_MODEL,
+                    messages=[
+                        {
+                            "role": "system",
+                            "content": system_prompt
+                        }
+                    ]
+                )
+            MetricsService.record_llm_usage(OPENAI_MODEL, "narration", response.usage)
+            narration = response.choices[0].message.content
+            LLMCacheService.set(OPENAI_MODEL, "narration", match_dict['match_id'], style, system_prompt, narration)
+            return narration
+        except OpenAIError as e:
+            OpenAIClientService.logger.error(f"Failed to get chat response: {e}")
+            raise OpenAIClientError(f"Failed to get chat response: {e}")
+        
+    @staticmethod
+    async def aget_chat_response(user_message: str) -> str:
+        """
+            Versão assíncrona de get_chat_response.
+        """
+        OpenAIClientService.logger.info("Getting chat response.")
+        
+        return await OpenAIClientService._aget_completion([
+            {
+                "role": "system",
+                "content": "You are a helpful assistant."
+            },
+            {
+                "role": "user",
+                "content": user_message
+            }
+        ])
+        
+    @staticmethod
+    async def aget_match_summary(match_dict: List[Dict[str, Any]], events_dict: Union[str, List[Dict[str, Any]]]) -> str:
+        """
+            Versão assíncrona de get_match_summary.
+        """
+        OpenAIClientService.logger.info("Getting match summary.")
+        
+        system_prompt = OpenAIClientService._build_match_summary_prompt(match_dict, events_dict)
+        
+        summary = await LLMCacheService.aget(OPENAI_MODEL, "summary", match_dict['match_id'], None, system_prompt)
+        
+        if summary is None:
+            summary = await OpenAIClientService._aget_completion([{"role": "system", "content": system_prompt}], "summary")
+            await LLMCacheService.aset(OPENAI_MODEL, "summary", match_dict['match_id'], None, system_prompt, summary)
+        
+        return summary
+    
+    @staticmethod
+    async def aget_match_narration(
+            match_dict: List[Dict[str, Any]],
+            events_dict: Union[str, List[Dict[str, Any]]],
+            style: Literal["Formal", "Humorous", "Technical"] = "Formal"
+        ) -> str:
+        """
+            Versão assíncrona de get_match_narration.
+        """
+        OpenAIClientService.logger.info("Getting match narration.")
+        
+        system_prompt = OpenAIClientService._build_match_narration_prompt(match_dict, events_dict, style)
+        
+        narration = await LLMCacheService.aget(OPENAI_MODEL, "narration", match_dict['match_id'], style, system_prompt)
+        
+        if narration is None:
+            narration = await OpenAIClientService._aget_completion([{"role": "system", "content": system_prompt}], "narration")
+            await LLMCacheService.aset(OPENAI_MODEL, "narration", match_dict['match_id'], style, system_prompt, narration)
+        
+        return narration
+    
+    @staticmethod
+    def _stream_completion(kind: str, match_id: int, style: Optional[str], system_prompt: str) -> Iterator[str]:
+        """
+            Gera a resposta do modelo em partes, à medida que os tokens chegam, gravando o texto final no cache.
+        """
+        cached = LLMCacheService.get(OPENAI_MODEL, kind, match_id, style, system_prompt)
+        
+        if cached is not None:
+            yield cached
+            return
+        
+        client = OpenAIClientService._get_client()
+        
+        chunks: List[str] = []
+        
+        try:
+            with MetricsService.track_upstream("openai", kind):
+                stream = client.chat.completions.create(
+                    model=OPENAI_MODEL,
+                    messages=[{"role": "system", "content": system_prompt}],
+                    stream=True,
+                    stream_options={"include_usage": True}
+                )
+                
+                for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        chunks.append(chunk.choices[0].delta.content)
+                        yield chunk.choices[0].delta.content
+                    
+                    # O último chunk traz apenas o uso de tokens
+                    MetricsService.record_llm_usage(OPENAI_MODEL, kind, getattr(chunk, "usage", None))
+        except OpenAIError as e:
+            OpenAIClientService.logger.error(f"Failed to stream chat response: {e}")
+            raise OpenAIClientError(f"Failed to stream chat response: {e}")
+        
+        LLMCacheService.set(OPENAI_MODEL, kind, match_id, style, system_prompt, "".join(chunks))
+    
+    @staticmethod
+    async def _astream_completion(kind: str, match_id: int, style: Optional[str], system_prompt: str) -> AsyncIterator[str]:
+        """
+            Versão assíncrona de _stream_completion.
+        """
+        cached = await LLMCacheService.aget(OPENAI_MODEL, kind, match_id, style, system_prompt)
+        
+        if cached is not None:
+            yield cached
+            return
+        
+        client = OpenAIClientService._get_async_client()
+        chunks: List[str] = []
+        
+        try:
+            with MetricsService.track_upstream("openai", kind):
+                stream = await client.chat.completions.create(
+                    model=OPENAI_MODEL,
+                    messages=[{"role": "system", "content": system_prompt}],
+                    stream=True,
+                    stream_options={"include_usage": True}
+                )
+                
+                async for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        chunks.append(chunk.choices[0].delta.content)
+                        yield chunk.choices[0].delta.content
+                    
+                    # O último chunk traz apenas o uso de tokens
+                    MetricsService.record_llm_usage(OPENAI_MODEL, kind, getattr(chunk, "usage", None))
+        except OpenAIError as e:
+            OpenAIClientService.logger.error(f"Failed to stream chat response: {e}")
+            raise OpenAIClientError(f"Failed to stream chat response: {e}")
+        
+        await LLMCacheService.aset(OPENAI_MODEL, kind, match_id, style, system_prompt, "".join(chunks))
+    
+    @staticmethod
+    def stream_match_narration(
+            match_dict: List[Dict[str, Any]],
+            events_dict: Union[str, List[Dict[str, Any]]],
+            style: Literal["Formal", "Humorous", "Technical"] = "Formal"
+        ) -> Iterator[str]:
+        """
+            Obtém a narração de uma partida em partes, à medida que é gerada.
+        """
+        OpenAIClientService.logger.info("Streaming match narration.")
+        
+        system_prompt = OpenAIClientService._build_match_narration_prompt(match_dict, events_dict, style)
+        return OpenAIClientService._stream_completion("narration", match_dict['match_id'], style, system_prompt)
+    
+    @staticmethod
+    def astream_match_summary(match_dict: List[Dict[str, Any]], events_dict: Union[str, List[Dict[str, Any]]]) -> AsyncIterator[str]:
+        """
+            Versão assíncrona em partes de get_match_summary.
+        """
+        OpenAIClientService.logger.info("Streaming match summary.")
+        
+        system_prompt = OpenAIClientService._build_match_summary_prompt(match_dict, events_dict)
+        return OpenAIClientService._astream_completion("summary", match_dict['match_id'], None, system_prompt)
+    
+    @staticmethod
+    def astream_match_narration(
+            match_dict: List[Dict[str, Any]],
+            events_dict: Union[str, List[Dict[str, Any]]],
+            style: Literal["Formal", "Humorous", "Technical"] = "Formal"
+        ) -> AsyncIterator[str]:
+        """
+            Versão assíncrona em partes de get_match_narration.
+        """
+        OpenAIClientService.logger.info("Streaming match narration.")
+        
+        system_prompt = OpenAIClientService._build_match_narration_prompt(match_dict, events_dict, style)
+        return OpenAIClientService._astream_completion("narration", match_dict['match_id'], style, system_prompt)
@@ -0,0 +1,207 @@
+from concurrent.futures import Executor
+from contextvars import ContextVar
+from functools import partial
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+import threading
+import cProfile
+import asyncio
+import logging
+import pstats
+import random
+import time
+import re
+import os
+
+# Configuração do profiling por requisição (desligado por padrão)
+PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", 0))
+PROFILING_ALLOW_HEADER = os.getenv("PROFILING_ALLOW_HEADER", "false").lower() in ("1", "true", "yes")
+PROFILING_DIR = os.getenv("PROFILING_DIR", ".profiles")
+PROFILING_MAX_FILES = int(os.getenv("PROFILING_MAX_FILES", 50))
+PROFILING_TOP_FUNCTIONS = int(os.getenv("PROFILING_TOP_FUNCTIONS", 5))
+
+PROFILE_HEADER = "X-Profile"
+
+class RequestProfile:
+    """
+        Profilers de uma requisição: o do event loop e um por chamada executada no pool de threads.
+
+        A partir do Python 3.12 só um cProfile pode estar ativo por vez no processo, e cada um só enxerga
+        a própria thread. Por isso o profiler do event loop é pausado enquanto a requisição aguarda o pool,
+        e as chamadas da requisição no pool são perfiladas uma de cada vez.
+    """
+    __slots__ = ("loop_profiler", "profilers", "_waiting", "_lock")
+
+    def __init__(self) -> None:
+        self.loop_profiler = cProfile.Profile()
+        self.profilers: List[cProfile.Profile] = [self.loop_profiler]
+        self._waiting = 0
+        self._lock = threading.Lock()
+
+    def pause(self) -> None:
+        """
+            Pausa o profiler do event loop enquanto a requisição aguarda o pool de threads.
+        """
+        if self._waiting == 0:
+            self.loop_profiler.disable()
+        self._waiting += 1
+
+    def resume(self) -> None:
+        """
+            Retoma o profiler do event loop quando não há mais chamadas da requisição no pool.
+        """
+        self._waiting -= 1
+        if self._waiting == 0:
+            self.loop_profiler.enable()
+
+    def runcall(self, func: Callable[[], Any]) -> Any:
+        """
+            Executa uma chamada no pool de threads com o seu próprio profiler.
+        """
+        with self._lock:
+            profiler = cProfile.Profile()
+            self.profilers.append(profiler)
+            return profiler.runcall(func)
+
+
+class ProfilingService:
+    """
+        Profiling opcional de requisições com cProfile.
+
+        Ativado pelo cabeçalho X-Profile: 1 (se PROFILING_ALLOW_HEADER) ou por amostragem (PROFILING_SAMPLE_RATE),
+        ambos desligados por padrão. Só uma requisição é perfilada por vez; as que chegam enquanto outra está
+        em profiling seguem sem ele. Apenas os PROFILING_MAX_FILES arquivos mais recentes são mantidos.
+    """
+    logger = logging.getLogger(__name__)
+
+    _current: ContextVar[Optional[RequestProfile]] = ContextVar("request_profile", default=None)
+    _active_lock = threading.Lock()
+
+    # Resumos dos últimos perfis, servidos em /debug/profiles
+    recent: deque = deque(maxlen=50)
+
+    @staticmethod
+    def should_profile(header_value: Optional[str]) -> bool:
+        """
+            Decide se a requisição será perfilada, pelo cabeçalho ou pela taxa de amostragem.
+        """
+        if PROFILING_ALLOW_HEADER and header_value and header_value.lower() in ("1", "true", "yes"):
+            return True
+
+        return PROFILING_SAMPLE_RATE > 0 and random.random() < PROFILING_SAMPLE_RATE
+
+    @staticmethod
+    def start() -> Optional[Any]:
+        """
+            Inicia o profiling da requisição atual, retornando o token para finish,
+            ou None se outra requisição já estiver sendo perfilada.
+        """
+        if not ProfilingService._active_lock.acquire(blocking=False):
+            ProfilingService.logger.info("Another request is being profiled, skipping profiling.")
+            return None
+
+        profile = RequestProfile()
+        token = ProfilingService._current.set(profile)
+        profile.loop_profiler.enable()
+        return token
+
+    @staticmethod
+    async def run_in_executor(executor: Executor, func: Callable[[], Any]) -> Any:
+        """
+            Executa uma chamada síncrona no pool de threads, perfilando-a junto com a requisição se for o caso.
+        """
+        loop = asyncio.get_running_loop()
+        profile = ProfilingService._current.get()
+
+        if profile is None:
+            return await loop.run_in_executor(executor, func)
+
+        profile.pause()
+
+        try:
+            return await loop.run_in_executor(executor, partial(profile.runcall, func))
+        finally:
+            profile.resume()
+
+    @staticmethod
+    def _build_filename(method: str, route: str, params: Dict[str, Any]) -> str:
+        """
+            Nome do arquivo pstats com data, método, rota e parâmetros.
+        """
+        query = "_".join(f"{key}-{value}" for key, value in params.items())
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}_{method}_{route.strip('/')}_{query}"
+        name = re.sub(r"[^A-Za-z0-9_.-]+", "-", name).strip("-")[:200]
+        return f"{name}.pstats"
+
+    @staticmethod
+    def _summarize(stats: pstats.Stats) -> List[Dict[str, Any]]:
+        """
+            Funções com maior tempo próprio (tottime), com o tempo acumulado e o número de chamadas.
+        """
+        hot_functions = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)[:PROFILING_TOP_FUNCTIONS]
+
+        return [
+            {
+                "function": f"{os.path.basename(filename)}:{line}({name})",
+                "calls": calls,
+                "tottime_ms": round(tottime * 1000, 2),
+                "cumtime_ms": round(cumtime * 1000, 2),
+            }
+            for (filename, line, name), (_, calls, tottime, cumtime, _) in hot_functions
+        ]
+
+    @staticmethod
+    def _rotate_files() -> None:
+        """
+            Remove os arquivos pstats mais antigos além de PROFILING_MAX_FILES.
+        """
+        paths = [
+            os.path.join(PROFILING_DIR, name) for name in os.listdir(PROFILING_DIR) if name.endswith(".pstats")
+        ]
+
+        for path in sorted(paths, key=os.path.getmtime)[:-PROFILING_MAX_FILES or None]:
+            try:
+                os.remove(path)
+            except OSError as e:
+                ProfilingService.logger.warning(f"Failed to remove old profile {path}: {e}")
+
+    @staticmethod
+    def finish(token: Any, method: str, route: str, params: Dict[str, Any], duration: float) -> Dict[str, Any]:
+        """
+            Encerra o profiling, grava o arquivo pstats e retorna o resumo das funções mais custosas.
+        """
+        profile = ProfilingService._current.get()
+        ProfilingService._current.reset(token)
+
+        profile.loop_profiler.disable()
+        ProfilingService._active_lock.release()
+
+        stats = pstats.Stats(profile.loop_profiler)
+
+        for profiler in profile.profilers[1:]:
+            stats.add(profiler)
+
+        os.makedirs(PROFILING_DIR, exist_ok=True)
+        path = os.path.join(PROFILING_DIR, ProfilingService._build_filename(method, route, params))
+        stats.dump_stats(path)
+        ProfilingService._rotate_files()
+
+        summary = {
+            "method": method,
+            "route": route,
+            "params": params,
+            "duration_ms": round(duration * 1000, 2),
+            "file": path,
+            "hot_functions": ProfilingService._summarize(stats),
+        }
+        ProfilingService.recent.append(summary)
+
+        ProfilingService.logger.info(f"Profiled {method} {route} in {summary['duration_ms']} ms, written to {path}")
+        return summary
+
+    @staticmethod
+    def format_header(summary: Dict[str, Any]) -> str:
+        """
+            Resumo curto para o cabeçalho X-Profile-Summary: função=tempo próprio em ms.
+        """
+        return "; ".join(f"{function['function']}={function['tottime_ms']}ms" for function in summary["hot_functions"])
@@ -0,0 +1,51 @@
+from collections import deque
+import asyncio
+import logging
+import time
+
+class RateLimiter:
+    """
+        Limitador assíncrono de requisições e tokens por minuto, em janela deslizante.
+
+        Cada chamada a acquire reserva uma requisição e a estimativa de tokens dela,
+        aguardando até que os dois orçamentos da última janela comportem a reserva.
+    """
+    logger = logging.getLogger(__name__)
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int, period: float = 60.0) -> None:
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.period = period
+        self._reservations: deque[tuple[float, int]] = deque()
+        self._used_tokens = 0
+        self._lock = asyncio.Lock()
+
+    def _expire(self, now: float) -> None:
+        """
+            Remove as reservas que já saíram da janela.
+        """
+        while self._reservations and now - self._reservations[0][0] >= self.period:
+            _, tokens = self._reservations.popleft()
+            self._used_tokens -= tokens
+
+    async def acquire(self, tokens: int) -> None:
+        """
+            Aguarda até haver orçamento para uma requisição com a quantidade de tokens estimada.
+        """
+        # Uma requisição maior que o orçamento inteiro nunca caberia, então ocupa a janela sozinha
+        tokens = min(tokens, self.tokens_per_minute)
+
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._expire(now)
+
+                if (len(self._reservations) < self.requests_per_minute
+                        and self._used_tokens + tokens <= self.tokens_per_minute):
+                    self._reservations.append((now, tokens))
+                    self._used_tokens += tokens
+                    return
+
+                wait = self.period - (now - self._reservations[0][0])
+                RateLimiter.logger.info(f"Rate limit budget exhausted, waiting {wait:.1f}s.")
+                await asyncio.sleep(wait)
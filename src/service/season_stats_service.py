@@ -0,0 +1,172 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from fastapi.exceptions import HTTPException
+from typing import List, Dict, Any, Optional
+from model.stats_bomb_model import SeasonPlayerStats, MATCH_STATS_FIELDS
+from service.statsbomb_service import StatsBombService
+from service.statsbomb_store import StatsBombStore
+from service.cache_service import SingleFlight
+import multiprocessing
+import pandas as pd
+import logging
+import os
+
+# Número de processos usados na agregação de uma temporada
+SEASON_STATS_WORKERS = int(os.getenv("SEASON_STATS_WORKERS", os.cpu_count() or 4))
+
+STAT_FIELDS = list(MATCH_STATS_FIELDS.values())
+
+def _parse_clock(clock: Optional[str]) -> Optional[float]:
+    """
+        Converte o relógio da partida ("MM:SS") em minutos.
+    """
+    if not isinstance(clock, str) or ":" not in clock:
+        return None
+
+    minutes, seconds = clock.split(":")[:2]
+    return int(minutes) + int(seconds) / 60
+
+def _count_match_stats(match_id: int) -> pd.DataFrame:
+    """
+        Calcula as estatísticas parciais de uma partida: uma linha por (jogador, time),
+        com os totais de MatchStats, os minutos jogados e a partida disputada.
+
+        Executada nos processos do pool, por isso é uma função de módulo.
+    """
+    match_tables = StatsBombService.get_match_tables(match_id)
+    player_counts = match_tables["player_event_counts"]
+    match_end = match_tables["match_end_minute"]
+
+    rows: List[Dict[str, Any]] = []
+
+    for team, lineup in StatsBombService._get_lineups_frames(match_id).items():
+        for player in lineup.to_dict(orient='records'):
+            if player['player_name'] not in player_counts.index:
+                continue
+
+            minutes_played = 0.0
+
+            for position in player['positions']:
+                from_minute = _parse_clock(position.get('from')) or 0.0
+                to_minute = _parse_clock(position.get('to'))
+                minutes_played += (match_end if to_minute is None else to_minute) - from_minute
+
+            rows.append({
+                "player_name": player['player_name'],
+                "team": team,
+                "matches_played": 1,
+                "minutes_played": minutes_played,
+                **player_counts.loc[player['player_name']].to_dict(),
+            })
+
+    return pd.DataFrame(rows)
+
+
+class SeasonStatsService:
+    """
+        Agregação das estatísticas dos jogadores em todas as partidas de uma competição/temporada.
+    """
+    logger = logging.getLogger(__name__)
+
+    # Requisições concorrentes da mesma temporada compartilham uma única agregação (e um único pool)
+    _single_flight = SingleFlight("season_stats")
+
+    @staticmethod
+    def _aggregate_season(competition_id: int, season_id: int) -> pd.DataFrame:
+        """
+            Distribui o cálculo por partida em um ProcessPoolExecutor e soma os resultados parciais.
+
+            Os processos são criados com spawn: um fork do worker do uvicorn, que tem várias threads,
+            poderia herdar locks (caches, índices, logging) presos por outra thread e travar.
+        """
+        matches = StatsBombService.get_matches_dict(competition_id, season_id)
+        partials: List[pd.DataFrame] = []
+        failed_matches: List[int] = []
+
+        SeasonStatsService.logger.info(f"Aggregating {len(matches)} matches with {SEASON_STATS_WORKERS} workers.")
+
+        with ProcessPoolExecutor(max_workers=SEASON_STATS_WORKERS, mp_context=multiprocessing.get_context("spawn")) as executor:
+            futures = {
+                executor.submit(_count_match_stats, match['match_id']): match['match_id']
+                for match in matches
+            }
+
+            for future in as_completed(futures):
+                try:
+                    partials.append(future.result())
+                except Exception as e:
+                    SeasonStatsService.logger.error(f"Failed to aggregate match_id {futures[future]}: {e}")
+                    failed_matches.append(futures[future])
+
+        partials = [partial for partial in partials if not partial.empty]
+
+        if not partials:
+            raise HTTPException(status_code=404, detail="Season events not found")
+
+        season_stats = (
+            pd.concat(partials, ignore_index=True)
+            .groupby(['player_name', 'team'], as_index=False)
+            .sum()
+            .sort_values('player_name')
+        )
+
+        # Só persiste agregações completas, para que uma falha não fique gravada
+        if failed_matches:
+            SeasonStatsService.logger.warning(f"Season aggregate not stored, failed matches: {failed_matches}")
+        else:
+            StatsBombStore.save("season_stats", f"{competition_id}_{season_id}", season_stats)
+
+        return season_stats
+
+    @staticmethod
+    def get_season_player_stats(
+            competition_id: int,
+            season_id: int,
+            player_name: str = None,
+            refresh: bool = False
+        ) -> List[SeasonPlayerStats]:
+        """
+            Obtém os totais, médias por 90 minutos e médias por partida dos jogadores de uma temporada.
+        """
+
+        SeasonStatsService.logger.info(f"Getting season player stats for competition_id {competition_id}, season_id {season_id}, player_name {player_name}")
+
+        season_stats = None if refresh else StatsBombStore.load("season_stats", f"{competition_id}_{season_id}")
+
+        if season_stats is None:
+            season_stats = SeasonStatsService._single_flight.do(
+                (competition_id, season_id),
+                lambda: SeasonStatsService._aggregate_season(competition_id, season_id)
+            )
+
+        if player_name:
+            season_stats = season_stats[season_stats['player_name'] == player_name]
+
+            if season_stats.empty:
+                raise HTTPException(status_code=404, detail="Player not found")
+
+        players_stats: List[SeasonPlayerStats] = []
+
+        for player in season_stats.to_dict(orient='records'):
+            totals = {field: int(player[field]) for field in STAT_FIELDS}
+            minutes_played = float(player['minutes_played'])
+            matches_played = int(player['matches_played'])
+
+            players_stats.append(SeasonPlayerStats(
+                competition_id=competition_id,
+                season_id=season_id,
+                player_name=player['player_name'],
+                team=player['team'],
+                matches_played=matches_played,
+                minutes_played=round(minutes_played, 1),
+                season_stats=totals,
+                stats_per_90={
+                    field: round(total * 90 / minutes_played, 2) if minutes_played else 0.0
+                    for field, total in totals.items()
+                },
+                stats_per_match={
+                    field: round(total / matches_played, 2)
+                    for field, total in totals.items()
+                }
+            ))
+
+        return players_stats
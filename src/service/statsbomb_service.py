@@ -1,25 +1,334 @@
 from statsbombpy import sb
-from typing import List, Any, Dict
+from typing import List, Any, Dict, Callable, Optional, Tuple
 import numpy as np
 from fastapi.exceptions import HTTPException
-from model.stats_bomb_model import PlayerProfile, MatchStats, PlayerInfo, Position
+from model.stats_bomb_model import PlayerProfile, MatchStats, PlayerInfo, Position, TeamMatchStats, PlayerMatchStats, MATCH_STATS_FIELDS
+from service.statsbomb_store import StatsBombStore
+from service.cache_service import LRUCache
+from service.metrics_service import MetricsService
+import pandas as pd
+import unicodedata
+import threading
 import logging
+import os
 
 class StatsBombService:
     logger = logging.getLogger(__name__)
     
+    # Cache em memória por recurso: (tamanho máximo, TTL em segundos)
+    CACHE_CONFIG = {
+        "competitions": (1, 3600),
+        "matches": (64, 3600),
+        "events": (64, 86400),
+        "lineups": (128, 86400),
+        "match_tables": (256, 86400),
+        "lineup_index": (128, 86400),
+        "encoded_events": (256, 86400),
+    }
+    
+    caches: Dict[str, LRUCache] = {
+        resource: LRUCache(
+            resource,
+            maxsize=int(os.getenv(f"STATSBOMB_CACHE_SIZE_{resource.upper()}", maxsize)),
+            ttl=float(os.getenv(f"STATSBOMB_CACHE_TTL_{resource.upper()}", ttl))
+        )
+        for resource, (maxsize, ttl) in CACHE_CONFIG.items()
+    }
+    
+    # Colunas que compartilham a mesma tabela de strings (categorias) no DataFrame compacto de eventos
+    SHARED_CATEGORY_COLUMNS = [
+        ['player', 'pass_recipient', 'substitution_replacement'],
+        ['team', 'possession_team'],
+    ]
+    
+    # Versão das tabelas derivadas por partida; ao mudar o formato, as tabelas armazenadas são recalculadas
+    MATCH_TABLES_VERSION = 1
+    
+    # Índices de partidas: (competition_id, season_id) -> (DataFrame indexado, {match_id: partida})
+    # e match_id -> (competition_id, season_id)
+    _season_match_index: Dict[Tuple[int, int], Tuple[pd.DataFrame, Dict[int, Dict[str, Any]]]] = {}
+    _match_season_index: Dict[int, Tuple[int, int]] = {}
+    _match_index_lock = threading.Lock()
+    
+    @staticmethod
+    def _cached(resource: str, key: str, loader: Callable[[], Any]) -> Any:
+        """
+            Obtém um recurso do cache em memória, depois do armazenamento local e por fim da statsbombpy.
+        """
+        return StatsBombService.caches[resource].get_or_set(
+            key,
+            lambda: StatsBombStore.fetch(
+                resource,
+                key,
+                lambda: MetricsService.call_upstream("statsbomb", resource, loader)
+            )
+        )
+    
+    @staticmethod
+    def get_cache_stats() -> List[Dict[str, Any]]:
+        """
+            Obtém os contadores de hit/miss dos caches em memória.
+        """
+        return [cache.get_stats() for cache in StatsBombService.caches.values()]
+    
+    @staticmethod
+    def clear_caches() -> None:
+        """
+            Limpa os caches em memória e os índices de partidas, como em um processo recém-iniciado.
+        """
+        for cache in StatsBombService.caches.values():
+            cache.invalidate()
+        
+        with StatsBombService._match_index_lock:
+            StatsBombService._season_match_index.clear()
+            StatsBombService._match_season_index.clear()
+    
+    @staticmethod
+    def _get_competitions_frame() -> pd.DataFrame:
+        """
+            Obtém o DataFrame de competições, passando pelo cache e armazenamento local.
+        """
+        return StatsBombService._cached("competitions", "competitions", lambda: sb.competitions())
+
+    @staticmethod
+    def _get_matches_frame(competition_id: int, season_id: int) -> pd.DataFrame:
+        """
+            Obtém o DataFrame de partidas de uma temporada, passando pelo cache e armazenamento local.
+        """
+        return StatsBombService._cached(
+            "matches",
+            f"{competition_id}_{season_id}",
+            lambda: sb.matches(competition_id=competition_id, season_id=season_id)
+        )
+
+    @staticmethod
+    def _get_events_frame(match_id: int) -> pd.DataFrame:
+        """
+            Obtém o DataFrame de eventos de uma partida, passando pelo cache e armazenamento local.
+        """
+        key = str(match_id)
+        
+        # Compacta também os eventos gravados no armazenamento antes da representação compacta
+        return StatsBombService.caches["events"].get_or_set(
+            key,
+            lambda: StatsBombService._compact_events(StatsBombStore.fetch(
+                "events",
+                key,
+                lambda: StatsBombService._compact_events(
+                    MetricsService.call_upstream("statsbomb", "events", sb.events, match_id=match_id)
+                )
+            ))
+        )
+
+    @staticmethod
+    def _is_text_column(values: pd.Series) -> bool:
+        """
+            Verifica se a coluna guarda objetos Python ou strings (object no pandas 2, str no pandas 3).
+        """
+        return values.dtype == object or isinstance(values.dtype, pd.StringDtype)
+    
+    @staticmethod
+    def _compact_events(events: pd.DataFrame) -> pd.DataFrame:
+        """
+            Converte o DataFrame de eventos da statsbombpy para uma representação colunar compacta.
+            
+            As colunas de texto repetitivas (type, player, team, outcomes...) e as colunas quase vazias viram
+            categóricas (códigos inteiros + uma tabela de strings), com jogadores e times compartilhando a
+            mesma tabela entre colunas. As colunas numéricas mantêm o tipo original, para não estreitar
+            os valores vistos por quem usa o DataFrame ou o exporta. Os dicts só são gerados na saída da
+            API (to_records). É idempotente.
+        """
+        events = events.copy()
+        shared_columns = set()
+        
+        for columns in StatsBombService.SHARED_CATEGORY_COLUMNS:
+            columns = [column for column in columns if column in events.columns and StatsBombService._is_text_column(events[column])]
+            
+            if not columns:
+                continue
+            
+            categories = pd.unique(pd.concat([events[column].dropna() for column in columns]))
+            dtype = pd.CategoricalDtype(sorted(categories))
+            
+            for column in columns:
+                events[column] = events[column].astype(dtype)
+                shared_columns.add(column)
+        
+        for column in events.columns:
+            values = events[column]
+            
+            if column in shared_columns:
+                continue
+            
+            if StatsBombService._is_text_column(values):
+                # Apenas colunas de valores escalares (sem listas/dicts) e com repetição compensam como categóricas
+                if (pd.api.types.infer_dtype(values, skipna=True) in ("string", "boolean", "empty")
+                        and values.nunique() <= len(values) // 2):
+                    events[column] = values.astype("category")
+        
+        return events
+
+    @staticmethod
+    def _get_lineups_frames(match_id: int) -> Dict[str, pd.DataFrame]:
+        """
+            Obtém os DataFrames de escalação dos dois times de uma partida, passando pelo cache e armazenamento local.
+        """
+        return StatsBombService._cached("lineups", str(match_id), lambda: sb.lineups(match_id=match_id))
+
     @staticmethod
-    def get_match_dict(match_id: int, competition_id: int, season_id: int) -> Dict[str, Any]:
+    def preload_match(match_id: int) -> bool:
+        """
+            Grava no armazenamento local os eventos e as escalações de uma partida, sem passar pelo cache em memória
+            (para não remover dele as partidas em uso). Retorna False se a partida já estava armazenada.
+        """
+        key = str(match_id)
+        
+        if all(StatsBombStore.contains(resource, key) for resource in ("events", "lineups", "match_tables")):
+            return False
+        
+        events = StatsBombStore.fetch(
+            "events",
+            key,
+            lambda: StatsBombService._compact_events(MetricsService.call_upstream("statsbomb", "events", sb.events, match_id=match_id))
+        )
+        StatsBombStore.fetch("lineups", key, lambda: MetricsService.call_upstream("statsbomb", "lineups", sb.lineups, match_id=match_id))
+        StatsBombStore.fetch("match_tables", key, lambda: StatsBombService._build_match_tables(events))
+        return True
+
+    @staticmethod
+    def normalize_player_name(player_name: str) -> str:
+        """
+            Normaliza um nome para busca: sem acentos, sem diferenciar maiúsculas e minúsculas e com espaços simples.
+        """
+        player_name = unicodedata.normalize("NFKD", player_name)
+        player_name = "".join(char for char in player_name if not unicodedata.combining(char))
+        return " ".join(player_name.casefold().split())
+
+    @staticmethod
+    def _build_lineup_index(lineups: Dict[str, pd.DataFrame]) -> Dict[str, Any]:
+        """
+            Indexa as escalações dos dois times de uma partida:
+            
+            - teams: time -> jogadores (dicts)
+            - by_id: player_id -> (time, jogador)
+            - by_name: nome ou apelido normalizado -> (time, jogador), com prioridade para o nome completo
+        """
+        teams: Dict[str, List[Dict[str, Any]]] = {}
+        by_id: Dict[int, Tuple[str, Dict[str, Any]]] = {}
+        by_name: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+        
+        for team, lineup in lineups.items():
+            teams[team] = lineup.to_dict(orient='records')
+            
+            for player in teams[team]:
+                by_id[player['player_id']] = (team, player)
+                by_name.setdefault(StatsBombService.normalize_player_name(player['player_name']), (team, player))
+        
+        for team, player in by_id.values():
+            if isinstance(player.get('player_nickname'), str):
+                by_name.setdefault(StatsBombService.normalize_player_name(player['player_nickname']), (team, player))
+        
+        return {"teams": teams, "by_id": by_id, "by_name": by_name}
+
+    @staticmethod
+    def get_lineup_index(match_id: int) -> Dict[str, Any]:
+        """
+            Obtém o índice das escalações de uma partida (ver _build_lineup_index), montado uma vez por partida.
+        """
+        return StatsBombService.caches["lineup_index"].get_or_set(
+            str(match_id),
+            lambda: StatsBombService._build_lineup_index(StatsBombService._get_lineups_frames(match_id))
+        )
+
+    @staticmethod
+    def find_player(match_id: int, player_name: Optional[str] = None, player_id: Optional[int] = None) -> Tuple[str, Dict[str, Any]]:
+        """
+            Busca um jogador nas escalações de uma partida por player_id ou pelo nome (ou apelido),
+            sem diferenciar acentos e maiúsculas. Retorna o time e os dados do jogador.
+        """
+        lineup_index = StatsBombService.get_lineup_index(match_id)
+        
+        if player_id is not None:
+            found = lineup_index["by_id"].get(player_id)
+        else:
+            found = lineup_index["by_name"].get(StatsBombService.normalize_player_name(player_name or ""))
+        
+        if found is None:
+            raise HTTPException(status_code=404, detail="Player not found")
+        
+        return found
+
+    @staticmethod
+    def _index_matches(competition_id: int, season_id: int) -> Dict[int, Dict[str, Any]]:
+        """
+            Indexa por match_id as partidas de uma temporada.
+            
+            O índice acompanha a entrada do cache de partidas: é refeito quando ela é recarregada (TTL).
+        """
+        season_key = (competition_id, season_id)
+        matches = StatsBombService.get_matches_frame(competition_id, season_id)
+        
+        with StatsBombService._match_index_lock:
+            indexed = StatsBombService._season_match_index.get(season_key)
+        
+        if indexed is not None and indexed[0] is matches:
+            return indexed[1]
+        
+        season_index = {match['match_id']: match for match in matches.to_dict(orient='records')}
+        
+        with StatsBombService._match_index_lock:
+            if indexed is not None:
+                for match_id in indexed[1]:
+                    StatsBombService._match_season_index.pop(match_id, None)
+            
+            StatsBombService._season_match_index[season_key] = (matches, season_index)
+            for match_id in season_index:
+                StatsBombService._match_season_index[match_id] = season_key
+        
+        return season_index
+    
+    @staticmethod
+    def get_match_season(match_id: int) -> Tuple[int, int]:
+        """
+            Obtém a competição e temporada (competition_id, season_id) de uma partida já indexada.
+            
+            Caso a partida ainda não esteja no índice, indexa as temporadas presentes no armazenamento local.
+        """
+        season_key = StatsBombService._match_season_index.get(match_id)
+        
+        if season_key is None:
+            for key in StatsBombStore.list_keys("matches"):
+                competition_id, season_id = map(int, key.split("_"))
+                StatsBombService._index_matches(competition_id, season_id)
+            
+            season_key = StatsBombService._match_season_index.get(match_id)
+        
+        if season_key is None:
+            raise HTTPException(
+                status_code=404,
+                detail="Match not indexed, competition_id and season_id are required"
+            )
+        
+        return season_key
+    
+    @staticmethod
+    def get_match_dict(match_id: int, competition_id: Optional[int] = None, season_id: Optional[int] = None) -> Dict[str, Any]:
         """
             Obtém informações de uma partida específica.
+            
+            Se competition_id e season_id não forem informados, a temporada é resolvida pelo índice de partidas.
         """
         StatsBombService.logger.info(f"Getting match for match_id {match_id}, competition_id {competition_id}, season_id {season_id}")
         
-        match = StatsBombService.get_matches_dict(competition_id, season_id)
-        for m in match:
-            if m['match_id'] == match_id:
-                return m
-        raise HTTPException(status_code=404, detail="Match not found")
+        if competition_id is None or season_id is None:
+            competition_id, season_id = StatsBombService.get_match_season(match_id)
+        
+        match = StatsBombService._index_matches(competition_id, season_id).get(match_id)
+        
+        if match is None:
+            raise HTTPException(status_code=404, detail="Match not found")
+        
+        return match
 
     @staticmethod
     def get_competitions_dict() -> List[Dict[str, Any]]:
@@ -28,7 +337,7 @@ class StatsBombService:
         """
         StatsBombService.logger.info("Getting competitions.")
         
-        return sb.competitions().to_dict(orient='records')
+        return StatsBombService._get_competitions_frame().to_dict(orient='records')
         
     @staticmethod
     def get_matches_dict(competition_id: int, season_id: int) -> List[Dict[str, Any]]:
@@ -37,40 +346,106 @@ class StatsBombService:
         """
         StatsBombService.logger.info(f"Getting matches for competition_id {competition_id}, season_id {season_id}")
         
-        return sb.matches(competition_id=competition_id, season_id=season_id).to_dict(orient='records')
+        # As partidas retornadas também ficam indexadas, permitindo resolver depois uma partida apenas pelo match_id
+        season_index = StatsBombService._index_matches(competition_id, season_id)
+        return [dict(match) for match in season_index.values()]
+    
+    @staticmethod
+    def get_matches_frame(competition_id: int, season_id: int) -> pd.DataFrame:
+        """
+            Obtém o DataFrame de partidas de uma temporada, sem conversão para dicts.
+        """
+        return StatsBombService._get_matches_frame(competition_id, season_id)
         
     @staticmethod
-    def get_events_dict(
+    def get_events_frame(
             match_id: int,
             event_type_list: List[str] = None,
             player_name: str = None
-        ) -> List[Dict[str, Any]]:    
+        ) -> pd.DataFrame:
         """
-            Obtém eventos de uma partida específica.
+            Obtém o DataFrame de eventos de uma partida, filtrado por tipo e jogador,
+            apenas com as colunas que possuem algum valor.
         """
-        
-        StatsBombService.logger.info(f"Getting events for match_id {match_id}, event_type_list {event_type_list}, player_name {player_name}")
-                
-        events = sb.events(match_id=match_id).to_dict(orient='records')
-        
-        # Tratamento de valores NaN e Inf
-        for event in events:
-            for key, value in event.items():
-                if isinstance(value, float) and (np.isnan(value) or np.isinf(value)):
-                    event[key] = None
+        events = StatsBombService._get_events_frame(match_id)
         
         # Filtra eventos específicos se necessário
-        if event_type_list:          
-            events = list(filter(lambda event: event['type'] in event_type_list, events))
+        if event_type_list:
+            events = events[events['type'].isin(event_type_list)]
             
         # Filtra eventos de jogadores específicos se necessário
         if player_name:
-            events = list(filter(lambda event: event['player'] == player_name, events))
-      
-        if not events:
+            events = events[events['player'] == player_name]
+        
+        if events.empty:
             raise HTTPException(status_code=404, detail="Events not found")
+        
+        return events.dropna(axis=1, how='all')
+    
+    @staticmethod
+    def get_events_page(
+            match_id: int,
+            event_type_list: List[str] = None,
+            player_name: str = None,
+            cursor: Optional[int] = None,
+            limit: Optional[int] = None,
+            fields: List[str] = None
+        ) -> Tuple[pd.DataFrame, Optional[int]]:
+        """
+            Obtém uma página de eventos ordenada pelo index do evento, a partir do cursor (exclusivo).
+            
+            Retorna a página, apenas com as colunas de fields se informadas, e o cursor da próxima página
+            (None quando não houver mais eventos).
+        """
+        
+        StatsBombService.logger.info(f"Getting events page for match_id {match_id}, cursor {cursor}, limit {limit}, fields {fields}")
+        
+        events = StatsBombService.get_events_frame(match_id, event_type_list, player_name).sort_values('index')
+        
+        if cursor is not None:
+            events = events[events['index'] > cursor]
+        
+        next_cursor = None
+        
+        if limit is not None and len(events) > limit:
+            events = events.iloc[:limit]
+            next_cursor = int(events['index'].iloc[-1])
+        
+        if fields:
+            events = events[[field for field in fields if field in events.columns]]
+        
+        return events, next_cursor
+    
+    @staticmethod
+    def to_records(frame: pd.DataFrame) -> List[Dict[str, Any]]:
+        """
+            Converte um DataFrame em lista de dicts, trocando NaN e Inf por None.
+        """
+        float_columns = frame.select_dtypes(include='float').columns
+        
+        if len(float_columns):
+            frame = frame.copy()
+            frame[float_columns] = frame[float_columns].replace([np.inf, -np.inf], np.nan)
+        
+        frame = frame.astype(object)
+        return frame.where(frame.notna(), None).to_dict(orient='records')
+        
+    @staticmethod
+    def get_events_dict(
+            match_id: int,
+            event_type_list: List[str] = None,
+            player_name: str = None
+        ) -> List[Dict[str, Any]]:    
+        """
+            Obtém eventos de uma partida específica.
+        """
+        
+        StatsBombService.logger.info(f"Getting events for match_id {match_id}, event_type_list {event_type_list}, player_name {player_name}")
+        
+        # Os filtros são aplicados no DataFrame e apenas as linhas restantes viram dicts
+        events = StatsBombService.get_events_frame(match_id, event_type_list, player_name)
                     
-        return events
+        return StatsBombService.to_records(events)
 
     @staticmethod
     def get_lineups_dict(match_id: int, team: str) -> List[Dict[str, Any]]:
@@ -78,8 +453,102 @@ class StatsBombService:
             Obtém escalações de uma partida específica.
         """
         StatsBombService.logger.info(f"Getting lineups for match_id {match_id}, team {team}")
+        
+        teams = StatsBombService.get_lineup_index(match_id)["teams"]
+        
+        if team not in teams:
+            raise HTTPException(status_code=404, detail="Team not found")
             
-        return sb.lineups(match_id=match_id)[team].to_dict(orient='records')
+        return list(teams[team])
+    
+    @staticmethod
+    def get_match_lineups_dict(match_id: int) -> Dict[str, List[Dict[str, Any]]]:
+        """
+            Obtém as escalações dos dois times de uma partida, em uma única busca.
+        """
+        StatsBombService.logger.info(f"Getting lineups for match_id {match_id}")
+        
+        return {team: list(players) for team, players in StatsBombService.get_lineup_index(match_id)["teams"].items()}
+    
+    @staticmethod
+    def _count_events_by_player(events: pd.DataFrame) -> pd.DataFrame:
+        """
+            Conta, em uma única agregação, os eventos de MatchStats de cada jogador (uma linha por jogador).
+        """
+        return (
+            events.groupby(['player', 'type'], observed=True)
+            .size()
+            .unstack(fill_value=0)
+            .reindex(columns=list(MATCH_STATS_FIELDS), fill_value=0)
+            .rename(columns=MATCH_STATS_FIELDS)
+        )
+    
+    @staticmethod
+    def _build_match_tables(events: pd.DataFrame) -> Dict[str, Any]:
+        """
+            Materializa as tabelas derivadas dos eventos de uma partida, calculadas uma única vez:
+            
+            - player_event_counts: jogador × campos de MatchStats
+            - team_totals: time × campos de MatchStats
+            - players: jogadores com eventos, em ordem de primeira aparição
+            - player_teams: jogador -> time
+            - match_end_minute: minuto do último evento
+        """
+        player_events = events.dropna(subset=['player', 'team']).sort_values('index')
+        player_teams = player_events.drop_duplicates('player').set_index('player')['team'].to_dict()
+        
+        team_totals = (
+            events.groupby(['team', 'type'], observed=True)
+            .size()
+            .unstack(fill_value=0)
+            .reindex(columns=list(MATCH_STATS_FIELDS), fill_value=0)
+            .rename(columns=MATCH_STATS_FIELDS)
+        )
+        
+        return {
+            "version": StatsBombService.MATCH_TABLES_VERSION,
+            "player_event_counts": StatsBombService._count_events_by_player(events),
+            "team_totals": team_totals,
+            "players": list(player_teams),
+            "player_teams": player_teams,
+            "match_end_minute": float((events['minute'] + events['second'] / 60).max()),
+        }
+    
+    @staticmethod
+    def _load_match_tables(match_id: int) -> Dict[str, Any]:
+        """
+            Lê as tabelas derivadas do armazenamento, ou as calcula a partir dos eventos e as grava ao lado deles.
+        """
+        key = str(match_id)
+        tables = StatsBombStore.load("match_tables", key)
+        
+        if tables is None or tables.get("version") != StatsBombService.MATCH_TABLES_VERSION:
+            StatsBombService.logger.info(f"Building match tables for match_id {match_id}")
+            tables = StatsBombService._build_match_tables(StatsBombService._get_events_frame(match_id))
+            
+            try:
+                StatsBombStore.save("match_tables", key, tables)
+            except OSError as e:
+                StatsBombService.logger.warning(f"Failed to write match tables {key} to store: {e}")
+        
+        return tables
+    
+    @staticmethod
+    def get_match_tables(match_id: int) -> Dict[str, Any]:
+        """
+            Obtém as tabelas derivadas de uma partida (ver _build_match_tables), passando pelo cache em memória.
+        """
+        return StatsBombService.caches["match_tables"].get_or_set(
+            str(match_id),
+            lambda: StatsBombService._load_match_tables(match_id)
+        )
+    
+    @staticmethod
+    def _build_match_stats(player_counts: pd.Series) -> MatchStats:
+        """
+            Cria o MatchStats de um jogador a partir da sua linha na contagem de eventos.
+        """
+        return MatchStats(**{field: int(total) for field, total in player_counts.items()})
     
     @staticmethod
     def get_player_profile(match_id, player_name: str) -> PlayerProfile:
@@ -89,101 +558,75 @@ class StatsBombService:
         
         StatsBombService.logger.info(f"Getting player profile for player_name {player_name}")
         
-        # Pega eventos do jogar em uma partida
-        player_events_dict: List[Dict[str, Any]] = StatsBombService.get_events_dict(match_id, player_name=player_name)
-        
-        # Descobre o time do jogador
-        player_team = None
-        
-        for event in player_events_dict:
-            if event['player'] == player_name:
-                if event['team'] is not None:
-                    player_team = event['team']
-                    break
-            
-        if player_team is None:
-            raise HTTPException(status_code=404, detail="Player team not found")
-        
-        
-        # Pega informações do jogador
-        player_info_dict: List[Dict[str, Any]] = StatsBombService.get_lineups_dict(match_id, player_team)
-        
-        player_info: PlayerInfo = None
-        
-        for player in player_info_dict:
-            if player['player_name'] == player_name:
-                player_info = player
-                break
-            
-        if player_info is None:
-            raise HTTPException(status_code=404, detail="Player info not found")
-        
-        player_info = PlayerInfo(**player_info)
-        
-        # Pega estatísticas do jogador na partida
-        match_stats: MatchStats = {
-            "total_passes": 0,
-            "total_ball_receipts": 0,
-            "total_carries": 0,
-            "total_pressures": 0,
-            "total_fouls_committed": 0,
-            "total_fouls_won": 0,
-            "total_dispossessed": 0,
-            "total_duels": 0,
-            "total_dribbled_past": 0,
-            "total_dribbles": 0,
-            "total_blocks": 0,
-            "total_interceptions": 0,
-            "total_ball_recoveries": 0,
-            "total_miscontrols": 0,
-            "total_shields": 0,
-            "total_shots": 0,
-            "total_goal_keeper": 0,
-            "total_bad_behaviour": 0,
-        }
+        # Busca o jogador no índice das escalações (por nome ou apelido, sem acentos), sem percorrer os eventos
+        _, player = StatsBombService.find_player(match_id, player_name)
+        
+        # Pega estatísticas do jogador na partida; assim como em get_player_profiles, só há perfil para quem tem eventos
+        player_counts = StatsBombService.get_match_tables(match_id)["player_event_counts"]
+        
+        if player['player_name'] not in player_counts.index:
+            raise HTTPException(status_code=404, detail="Player events not found")
+        
+        return PlayerProfile(
+            match_id=match_id,
+            match_stats=StatsBombService._build_match_stats(player_counts.loc[player['player_name']]),
+            player_info=PlayerInfo(**player)
+        )
+    
+    @staticmethod
+    def get_player_profiles(match_id: int) -> List[PlayerProfile]:
+        """
+            Obtém o perfil de todos os jogadores com eventos em uma partida específica.
+            
+            As contagens vêm das tabelas derivadas da partida e são cruzadas com as escalações dos dois times.
+        """
+        
+        StatsBombService.logger.info(f"Getting player profiles for match_id {match_id}")
         
-        for event in player_events_dict:
-            event_type = event['type']
-            player = event['player']
-            
-            if player == player_name:                
-                if event_type == 'Pass':
-                    match_stats["total_passes"] += 1
-                elif event_type == 'Ball Receipt*':
-                    match_stats["total_ball_receipts"] += 1
-                elif event_type == 'Carry':
-                    match_stats["total_carries"] += 1
-                elif event_type == 'Pressure':
-                    match_stats["total_pressures"] += 1
-                elif event_type == 'Foul Committed':
-                    match_stats["total_fouls_committed"] += 1
-                elif event_type == 'Foul Won':
-                    match_stats["total_fouls_won"] += 1
-                elif event_type == 'Dispossessed':
-                    match_stats["total_dispossessed"] += 1
-                elif event_type == 'Duel':
-                    match_stats["total_duels"] += 1
-                elif event_type == 'Dribbled Past':
-                    match_stats["total_dribbled_past"] += 1
-                elif event_type == 'Dribble':
-                    match_stats["total_dribbles"] += 1
-                elif event_type == 'Block':
-                    match_stats["total_blocks"] += 1
-                elif event_type == 'Interception':
-                    match_stats["total_interceptions"] += 1
-                elif event_type == 'Ball Recovery':
-                    match_stats["total_ball_recoveries"] += 1
-                elif event_type == 'Miscontrol':
-                    match_stats["total_miscontrols"] += 1
-                elif event_type == 'Shield':
-                    match_stats["total_shields"] += 1
-                elif event_type == 'Shot':
-                    match_stats["total_shots"] += 1
-                elif event_type == 'Goal Keeper':
-                    match_stats["total_goal_keeper"] += 1
-                elif event_type == 'Bad Behaviour':
-                    match_stats["total_bad_behaviour"] += 1
-                else:
-                    pass
+        player_counts = StatsBombService.get_match_tables(match_id)["player_event_counts"]
+        
+        player_profiles: List[PlayerProfile] = []
+        
+        for players in StatsBombService.get_lineup_index(match_id)["teams"].values():
+            for player in players:
+                if player['player_name'] not in player_counts.index:
+                    continue
                 
-        return PlayerProfile(match_id=match_id, match_stats=match_stats, player_info=player_info)
\ No newline at end of file
+                player_profiles.append(PlayerProfile(
+                    match_id=match_id,
+                    match_stats=StatsBombService._build_match_stats(player_counts.loc[player['player_name']]),
+                    player_info=PlayerInfo(**player)
+                ))
+        
+        return player_profiles
+    
+    @staticmethod
+    def get_team_stats(match_id: int) -> List[TeamMatchStats]:
+        """
+            Obtém os totais de MatchStats de cada time em uma partida, a partir das tabelas derivadas.
+        """
+        team_totals = StatsBombService.get_match_tables(match_id)["team_totals"]
+        
+        return [
+            TeamMatchStats(team=team, match_stats=StatsBombService._build_match_stats(totals))
+            for team, totals in team_totals.iterrows()
+        ]
+    
+    @staticmethod
+    def get_player_stats(match_id: int, team: Optional[str] = None) -> List[PlayerMatchStats]:
+        """
+            Obtém as estatísticas de todos os jogadores com eventos em uma partida (ou de um time),
+            a partir das tabelas derivadas.
+        """
+        match_tables = StatsBombService.get_match_tables(match_id)
+        player_counts = match_tables["player_event_counts"]
+        
+        return [
+            PlayerMatchStats(
+                player_name=player_name,
+                team=player_team,
+                match_stats=StatsBombService._build_match_stats(player_counts.loc[player_name])
+            )
+            for player_name, player_team in match_tables["player_teams"].items()
+            if team is None or player_team == team
+        ]
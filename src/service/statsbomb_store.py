@@ -0,0 +1,179 @@
+from statsbombpy import public
+from fastapi.exceptions import HTTPException
+from requests.adapters import HTTPAdapter
+from typing import Any, Callable, List
+import pandas as pd
+import requests
+import tempfile
+import logging
+import json
+import time
+import os
+
+# Configuração do armazenamento local
+STORE_DIR = os.getenv("STATSBOMB_STORE_DIR", ".statsbomb_store")
+OPEN_DATA_DIR = os.getenv("STATSBOMB_OPEN_DATA_DIR")
+OFFLINE_MODE = os.getenv("STATSBOMB_OFFLINE", "false").lower() in ("1", "true", "yes")
+MAX_CONCURRENCY = int(os.getenv("STATSBOMB_MAX_CONCURRENCY", 16))
+
+# Timeouts (segundos) de conexão e de leitura das chamadas ao open-data; sem eles, um download travado
+# prenderia uma thread do pool e todas as requisições agrupadas na mesma chave
+CONNECT_TIMEOUT = float(os.getenv("STATSBOMB_CONNECT_TIMEOUT", 10))
+READ_TIMEOUT = float(os.getenv("STATSBOMB_READ_TIMEOUT", 60))
+
+# Idade máxima em segundos dos recursos que mudam com o tempo (novas temporadas e partidas).
+# Eventos e escalações de partidas disputadas não mudam e ficam no armazenamento sem expiração.
+STORE_MAX_AGE = {
+    resource: float(os.getenv(f"STATSBOMB_STORE_MAX_AGE_{resource.upper()}", 3600))
+    for resource in ("competitions", "matches")
+}
+
+# Prefixo comum das URLs do open-data da StatsBomb (statsbombpy.config.OPEN_DATA_PATHS)
+OPEN_DATA_URL_PREFIX = "/open-data/master/data/"
+
+class StatsBombStore:
+    """
+        Armazenamento persistente em disco dos DataFrames retornados pela statsbombpy.
+
+        Partidas históricas não mudam, então eventos e escalações são baixados uma única vez e
+        servidos do disco nas chamadas seguintes. Competições e partidas de uma temporada expiram
+        após STORE_MAX_AGE, para que novas temporadas e partidas apareçam. Os arquivos são gravados com pickle
+        para preservar as colunas aninhadas (location, positions, tactics) exatamente
+        como a statsbombpy as entrega.
+    """
+    logger = logging.getLogger(__name__)
+
+    # Sessão HTTP compartilhada, reaproveitando conexões com o open-data entre as chamadas
+    _session = requests.Session()
+    _session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=MAX_CONCURRENCY))
+
+    @staticmethod
+    def get_path(resource: str, key: str) -> str:
+        """
+            Caminho do arquivo de um recurso no armazenamento.
+        """
+        return os.path.join(STORE_DIR, resource, f"{key}.pkl")
+
+    @staticmethod
+    def contains(resource: str, key: str) -> bool:
+        """
+            Verifica se um recurso já está no armazenamento.
+        """
+        return os.path.exists(StatsBombStore.get_path(resource, key))
+
+    @staticmethod
+    def is_expired(resource: str, key: str) -> bool:
+        """
+            Verifica se um recurso com idade máxima foi gravado há mais tempo que ela.
+        """
+        max_age = STORE_MAX_AGE.get(resource)
+
+        if max_age is None:
+            return False
+
+        try:
+            return time.time() - os.path.getmtime(StatsBombStore.get_path(resource, key)) > max_age
+        except OSError:
+            return True
+
+    @staticmethod
+    def list_keys(resource: str) -> List[str]:
+        """
+            Lista as chaves de um recurso presentes no armazenamento.
+        """
+        resource_dir = os.path.join(STORE_DIR, resource)
+
+        if not os.path.isdir(resource_dir):
+            return []
+
+        return [name[:-len(".pkl")] for name in os.listdir(resource_dir) if name.endswith(".pkl")]
+
+    @staticmethod
+    def load(resource: str, key: str) -> Any:
+        """
+            Lê um recurso do armazenamento, ou None caso não exista.
+        """
+        path = StatsBombStore.get_path(resource, key)
+
+        if not os.path.exists(path):
+            return None
+
+        try:
+            return pd.read_pickle(path)
+        except Exception as e:
+            StatsBombStore.logger.warning(f"Failed to read {path} from store, ignoring it: {e}")
+            return None
+
+    @staticmethod
+    def save(resource: str, key: str, data: Any) -> None:
+        """
+            Grava um recurso no armazenamento de forma atômica.
+        """
+        path = StatsBombStore.get_path(resource, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Escreve em um arquivo temporário único (por processo e thread) para que leitores concorrentes
+        # nunca vejam um arquivo parcial
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=f"{key}.", suffix=".tmp")
+        os.close(fd)
+
+        try:
+            pd.to_pickle(data, tmp_path)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+    @staticmethod
+    def fetch(resource: str, key: str, loader: Callable[[], Any]) -> Any:
+        """
+            Obtém um recurso do armazenamento, ou do loader (statsbombpy) caso ainda não exista ou tenha expirado.
+
+            Se o loader falhar, um recurso expirado ainda é servido do armazenamento.
+        """
+        stored = StatsBombStore.load(resource, key)
+
+        if stored is not None and not StatsBombStore.is_expired(resource, key):
+            StatsBombStore.logger.info(f"Serving {resource} {key} from store.")
+            return stored
+
+        try:
+            data = loader()
+        except Exception as e:
+            if stored is None:
+                raise
+
+            StatsBombStore.logger.warning(f"Failed to refresh {resource} {key}, serving expired copy from store: {e}")
+            return stored
+
+        try:
+            StatsBombStore.save(resource, key, data)
+        except OSError as e:
+            StatsBombStore.logger.warning(f"Failed to write {resource} {key} to store: {e}")
+
+        return data
+
+    @staticmethod
+    def get_response(path: str) -> Any:
+        """
+            Substitui statsbombpy.public.get_response, lendo o JSON do diretório local do open-data
+            quando disponível e só indo à rede fora do modo offline.
+        """
+        if OPEN_DATA_DIR and OPEN_DATA_URL_PREFIX in path:
+            local_path = os.path.join(OPEN_DATA_DIR, path.split(OPEN_DATA_URL_PREFIX, 1)[1])
+
+            if os.path.exists(local_path):
+                with open(local_path, encoding="utf-8") as f:
+                    return json.load(f)
+
+        if OFFLINE_MODE:
+            StatsBombStore.logger.error(f"Resource {path} not available in offline mode.")
+            raise HTTPException(status_code=503, detail="Resource not available in offline mode")
+
+        response = StatsBombStore._session.get(path, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT))
+        response.raise_for_status()
+        return response.json()
+
+
+# Todas as chamadas públicas da statsbombpy passam a respeitar o diretório local e o modo offline
+public.get_response = StatsBombStore.get_response
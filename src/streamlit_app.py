@@ -1,19 +1,24 @@
+from dotenv import load_dotenv
+
+# Carregar variáveis de ambiente antes dos serviços, que leem sua configuração na importação
+load_dotenv()
+
 import streamlit as st
 from streamlit_option_menu import option_menu
 from service.statsbomb_service import StatsBombService
+from service.openai_client_service import OpenAIClientService
+from service.event_encoder_service import EventEncoderService
 from model.stats_bomb_model import MatchEvents, PlayerProfile
 from typing import Dict, Tuple, List, Any
-from agent.football_agents import load_agent, load_tools
+from agent.football_agents import load_agent, load_tool_prompt_inputs, run_agent
+from agent.football_tools import conversation_cache
+from langchain.agents import AgentExecutor
 import pandas as pd
 import logging
 import plotly.graph_objects as go
 from langchain.schema import AIMessage, HumanMessage
 from langchain.memory import ConversationBufferMemory
 from langchain_community.chat_message_histories import StreamlitChatMessageHistory
-from dotenv import load_dotenv
-
-# Carregar variáveis de ambiente
-load_dotenv()
 
 # Configuração da página
 st.set_page_config(layout="wide",
@@ -37,6 +42,10 @@ if "memory" not in st.session_state:
 
 memory = st.session_state.memory
 
+# Cache dos resultados das tools do agente na conversa atual
+if "tool_cache" not in st.session_state:
+    st.session_state["tool_cache"] = {}
+
 # Modal para exibir erros
 @st.dialog("Error")
 def global_error_dialog() -> None:
@@ -56,12 +65,24 @@ def get_cached_events(match_id, selected_events) -> List[Dict[str, Any]]:
     return StatsBombService.get_events_dict(match_id, event_type_list=selected_events)
 
 @st.cache_data(ttl=3600)
-def get_cached_lineups(match_id, player_team) -> List[Dict[str, Any]]:
-    return StatsBombService.get_lineups_dict(match_id, player_team)
+def get_cached_lineups(match_id) -> Dict[str, List[Dict[str, Any]]]:
+    return StatsBombService.get_match_lineups_dict(match_id)
 
 @st.cache_data(ttl=3600)
-def get_cached_player_profile(match_id, player) -> PlayerProfile:
-    return StatsBombService.get_player_profile(match_id, player["player_name"])
+def get_cached_player_profiles(match_id) -> Dict[str, PlayerProfile]:
+    return {
+        player_profile.player_info.player_name: player_profile
+        for player_profile in StatsBombService.get_player_profiles(match_id)
+    }
+
+# Cache do agente e das descrições das ferramentas, construídos uma vez por processo
+@st.cache_resource
+def get_cached_agent() -> AgentExecutor:
+    return load_agent()
+
+@st.cache_resource
+def get_cached_tool_prompt_inputs() -> Dict[str, List[str]]:
+    return load_tool_prompt_inputs()
 
 def sidebar_option_view() -> Tuple[int | None, Dict | None, Dict | None]:
     """
@@ -115,7 +136,7 @@ def player_profile_view(match_id, match):
         )
         
     if player_team:
-        players = get_cached_lineups(match_id, player_team)
+        players = get_cached_lineups(match_id)[player_team]
             
         player = st.selectbox(
                 "Choose a Player",
@@ -134,13 +155,18 @@ def player_profile_view(match_id, match):
                 st.markdown(f"<h4 style='text-align: center;'>Position: {position['position']}, from: {position['from']} to: {position['to']}</h4>", unsafe_allow_html=True)
          
             try:
-                player_profile = get_cached_player_profile(match_id, player)
+                player_profile = get_cached_player_profiles(match_id).get(player['player_name'])
             except Exception as e:
                 if "404" in str(e):
                     st.warning("Events not found for the selected player")
                     return 
                 raise e
                 
+            # Jogadores da escalação sem eventos na partida não têm perfil
+            if player_profile is None:
+                st.warning("Events not found for the selected player")
+                return 
+                
             match_stats = player_profile.match_stats.model_dump()
 
             fig = go.Figure()
@@ -178,6 +204,22 @@ def match_events_view(match_id):
         df = df.dropna(axis=1, how='all')
         st.dataframe(df)
 
+def match_narration_view(match_id, match):
+    """
+        View para exibir a narração de uma partida, renderizada à medida que é gerada
+    """
+    style = st.selectbox(
+            "Narration Style",
+            ["Formal", "Humorous", "Technical"]
+        )
+    
+    if st.button("Narrate Match"):
+        # Assim como na API, os eventos são enviados em formato compacto, dentro do orçamento de tokens
+        events_dict, _ = EventEncoderService.encode_match(match)
+        
+        with st.container(border=True):
+            st.write_stream(OpenAIClientService.stream_match_narration(match, events_dict, style))
+
 def memorize_message():
     """
         Callback para memorizar mensagens
@@ -189,7 +231,11 @@ def ai_agent_view(related_info: Dict[str, Any]):
     """
         View para o agente de IA
     """
-    st.button("Clear Chat", on_click=lambda: st.session_state["memory"].chat_memory.clear())
+    def clear_chat():
+        st.session_state["memory"].chat_memory.clear()
+        st.session_state["tool_cache"].clear()
+
+    st.button("Clear Chat", on_click=clear_chat)
     
     st.chat_input(key="user_input", on_submit=memorize_message) 
     
@@ -208,20 +254,17 @@ def ai_agent_view(related_info: Dict[str, Any]):
                         
             with st.spinner("Agent is responding..."):
                 try:
-                    agent = load_agent()
-                    tools = load_tools()
-                    tool_names = [tool.name for tool in tools]
-                    tool_descriptions = [tool.description for tool in tools]
+                    agent = get_cached_agent()
 
                     input_data = {
                         "input": user_input,
                         "related_info": related_info,
                         "agent_scratchpad": "",
-                        "tool_names": tool_names,
-                        "tools": tool_descriptions,
+                        **get_cached_tool_prompt_inputs(),
                     }
                     
-                    response = agent.invoke(input=input_data, handle_parsing_errors=True)
+                    with conversation_cache(st.session_state["tool_cache"]):
+                        response = run_agent(agent, input_data)
 
                     if isinstance(response, dict) and "output" in response:
                         output = response.get("output")
@@ -248,8 +291,8 @@ def main_view():
 
     selected_option = option_menu(
         menu_title=None,
-        options=["Match Events", "Player Profile", "AI Agent"], 
-        icons=['lightning', 'file-earmark-person', "robot"], 
+        options=["Match Events", "Player Profile", "Match Narration", "AI Agent"], 
+        icons=['lightning', 'file-earmark-person', 'mic', "robot"], 
         default_index=0,
         orientation="horizontal"
     )
@@ -260,12 +303,16 @@ def main_view():
     elif selected_option == "Player Profile":        
         player_profile_view(match_id, match)
     
+    elif selected_option == "Match Narration":
+        match_narration_view(match_id, match)
+    
     elif selected_option == "AI Agent":
+        lineups = get_cached_lineups(match_id)
         related_info = {
             "match_info": match,
             "competition_info": competition_season,
-            "lineup_home_team": get_cached_lineups(match_id, match['home_team']),
-            "lineup_away_team": get_cached_lineups(match_id, match['away_team'])
+            "lineup_home_team": lineups[match['home_team']],
+            "lineup_away_team": lineups[match['away_team']]
         }
         ai_agent_view(related_info)
         